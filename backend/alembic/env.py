@@ -5,6 +5,7 @@ from alembic import context
 
 from app.core.config import settings
 from app.db.base import Base
+from app.db.partitions import DEFAULT_PARTITION, PARTITION_NAME
 
 config = context.config
 
@@ -16,6 +17,15 @@ target_metadata = Base.metadata
 def get_url():
     return settings.SQLALCHEMY_DATABASE_URI
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Trigram search indexes are managed by hand-written migrations only
+    if type_ == "index" and name and name.endswith("_trgm"):
+        return False
+    # stock_movements partitions are created and retired by app.db.partitions
+    if type_ == "table" and reflected and (name == DEFAULT_PARTITION or PARTITION_NAME.match(name)):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     url = get_url()
     context.configure(
@@ -23,6 +33,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -39,7 +50,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
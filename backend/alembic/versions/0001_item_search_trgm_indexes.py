@@ -0,0 +1,52 @@
+"""trigram indexes for item name and barcode search
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs searched by app.core.search; "items" is the legacy table
+SEARCH_COLUMNS = [
+    ("inventory_items", "name"),
+    ("inventory_items", "barcode"),
+    ("items", "name"),
+    ("items", "barcode"),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    inspector = sa.inspect(bind)
+    for table, column in SEARCH_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        op.create_index(
+            f"ix_{table}_{column}_trgm",
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    for table, column in SEARCH_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
@@ -0,0 +1,39 @@
+"""updated_at indexes for listing ETags
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns) read by app.core.conditional's max(updated_at) queries
+INDEXES = [
+    ("ix_warehouses_updated_at", "warehouses", ["updated_at"]),
+    ("ix_storage_locations_warehouse_updated_at", "storage_locations", ["warehouse_id", "updated_at"]),
+    ("ix_inventory_items_updated_at", "inventory_items", ["updated_at"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if inspector.has_table(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, _ in INDEXES:
+        if inspector.has_table(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,98 @@
+"""partition stock_movements by month
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.partitions import DEFAULT_PARTITION, add_months, create_partition_sql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created past the current one; python -m app.db.partitions keeps this going
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = [
+    ("item_id", "inventory_items"),
+    ("from_location_id", "storage_locations"),
+    ("to_location_id", "storage_locations"),
+    ("user_id", "users"),
+]
+INDEXES = [
+    ("ix_stock_movements_created_at_id", ["created_at", "id"]),
+    ("ix_stock_movements_item_id_created_at_id", ["item_id", "created_at", "id"]),
+]
+
+
+def _swap_out(old: str) -> None:
+    """Rename stock_movements (and its constraint/index names) out of the way."""
+    op.execute(f"ALTER TABLE stock_movements RENAME TO {old}")
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT stock_movements_pkey TO {old}_pkey")
+    for name, _ in INDEXES + [("ix_stock_movements_id", None)]:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    for column, _ in FOREIGN_KEYS:
+        op.execute(f"ALTER TABLE {old} DROP CONSTRAINT IF EXISTS stock_movements_{column}_fkey")
+
+
+def _finish(old: str, primary_key: str) -> None:
+    """Constraints, indexes and sequence for the new stock_movements, then copy and drop ``old``."""
+    op.execute(f"ALTER TABLE stock_movements ADD CONSTRAINT stock_movements_pkey PRIMARY KEY ({primary_key})")
+    sequence = op.get_bind().execute(
+        sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": old}
+    ).scalar()
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY stock_movements.id")
+    for column, table in FOREIGN_KEYS:
+        op.create_foreign_key(f"stock_movements_{column}_fkey", "stock_movements", table, [column], ["id"])
+    for name, columns in INDEXES:
+        op.create_index(name, "stock_movements", columns)
+    op.execute(f"INSERT INTO stock_movements SELECT * FROM {old}")
+    op.execute(f"DROP TABLE {old}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not sa.inspect(bind).has_table("stock_movements"):
+        return
+    _swap_out("stock_movements_unpartitioned")
+    # The partition key must be NOT NULL and part of the primary key
+    op.execute(
+        "UPDATE stock_movements_unpartitioned "
+        "SET created_at = COALESCE(updated_at, now() AT TIME ZONE 'utc') WHERE created_at IS NULL"
+    )
+    op.execute(
+        "CREATE TABLE stock_movements (LIKE stock_movements_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute("ALTER TABLE stock_movements ALTER COLUMN created_at SET NOT NULL")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM stock_movements_unpartitioned")).scalar()
+    this_month = datetime.utcnow().date().replace(day=1)
+    month = (oldest.date() if oldest else this_month).replace(day=1)
+    while month <= add_months(this_month, MONTHS_AHEAD):
+        op.execute(create_partition_sql(month))
+        month = add_months(month, 1)
+    # Catches rows outside every monthly partition (e.g. if maintenance stops running)
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF stock_movements DEFAULT")
+
+    _finish("stock_movements_unpartitioned", "id, created_at")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not sa.inspect(bind).has_table("stock_movements"):
+        return
+    _swap_out("stock_movements_partitioned")
+    op.execute("CREATE TABLE stock_movements (LIKE stock_movements_partitioned INCLUDING DEFAULTS)")
+    _finish("stock_movements_partitioned", "id")
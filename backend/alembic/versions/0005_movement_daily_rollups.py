@@ -0,0 +1,47 @@
+"""movement_daily_rollups table for throughput analytics
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'movement_daily_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        # Shares the enum type created with stock_movements
+        sa.Column(
+            'movement_type',
+            postgresql.ENUM('INBOUND', 'OUTBOUND', 'TRANSFER', name='movementtype', create_type=False),
+            nullable=False,
+        ),
+        sa.Column('quantity', sa.BigInteger(), nullable=False),
+        sa.Column('movements', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day', 'item_id', 'location_id', 'movement_type'),
+    )
+    op.create_index('ix_movement_daily_rollups_item_id_day', 'movement_daily_rollups', ['item_id', 'day'])
+    op.create_index('ix_movement_daily_rollups_location_id_day', 'movement_daily_rollups', ['location_id', 'day'])
+    # Populate from the existing movements with: python -m app.db.backfill_rollups
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movement_daily_rollups_location_id_day', table_name='movement_daily_rollups')
+    op.drop_index('ix_movement_daily_rollups_item_id_day', table_name='movement_daily_rollups')
+    op.drop_table('movement_daily_rollups')
@@ -0,0 +1,38 @@
+"""low_stock_items set of items below min_quantity
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'low_stock_items',
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('below_since', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('item_id'),
+    )
+    # Timestamps are stored as naive UTC
+    now = "timezone('utc', now())" if op.get_bind().dialect.name == "postgresql" else "CURRENT_TIMESTAMP"
+    op.execute(
+        f"INSERT INTO low_stock_items (item_id, below_since) SELECT id, {now} FROM inventory_items "
+        "WHERE COALESCE(quantity, 0) < COALESCE(min_quantity, 0)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('low_stock_items')
@@ -0,0 +1,62 @@
+"""keyset pagination indexes for the listings
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns) read by the Cursor-paginated listings. An index is
+# skipped when its table or columns don't exist (the legacy app's
+# stock_movements has "timestamp", the API's "created_at") or it is already there
+INDEXES = [
+    ("ix_warehouses_created_at_id", "warehouses", ["created_at", "id"]),
+    ("ix_storage_locations_warehouse_created_at_id", "storage_locations", ["warehouse_id", "created_at", "id"]),
+    ("ix_inventory_items_created_at_id", "inventory_items", ["created_at", "id"]),
+    ("ix_inventory_items_location_created_at_id", "inventory_items", ["storage_location_id", "created_at", "id"]),
+    ("ix_stock_movements_created_at_id", "stock_movements", ["created_at", "id"]),
+    ("ix_stock_movements_item_id_created_at_id", "stock_movements", ["item_id", "created_at", "id"]),
+    ("ix_stock_movements_timestamp_id", "stock_movements", ["timestamp", "id"]),
+    ("ix_stock_movements_item_id_timestamp_id", "stock_movements", ["item_id", "timestamp", "id"]),
+]
+
+# Created on every partition by 0004 on PostgreSQL, which also drops them
+PARTITION_INDEXES = {"ix_stock_movements_created_at_id", "ix_stock_movements_item_id_created_at_id"}
+
+
+def _applicable(inspector, table, columns) -> bool:
+    if not inspector.has_table(table):
+        return False
+    return set(columns) <= {column["name"] for column in inspector.get_columns(table)}
+
+
+def _existing(inspector, table) -> set:
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if _applicable(inspector, table, columns) and name not in _existing(inspector, table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for name, table, _ in INDEXES:
+        if bind.dialect.name == "postgresql" and name in PARTITION_INDEXES:
+            continue
+        if inspector.has_table(table) and name in _existing(inspector, table):
+            op.drop_index(name, table_name=table)
@@ -1,32 +1,82 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Callable, Collection, FrozenSet, Generator, Optional
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core import security
 from app.core.config import settings
+from app.core import idempotency
+from app.core.idempotency import UNSAFE_METHODS
+from app.db import session
 from app.db.session import SessionLocal
-from app.models.user import User
-from app.schemas.user import TokenPayload
+from app.schemas.user import CurrentUser, TokenPayload
 from app.crud import crud_user
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
+
+def _mark_write(request: Request) -> None:
+    # Read-your-writes (per process): a user's reads skip the replica for a while after a write
+    if session.read_router is None or request.method not in UNSAFE_METHODS:
+        return
+    caller = token_subject(request)
+    if caller:
+        session.read_router.mark_write(caller)
+
+def _read_from_replica(request: Request) -> bool:
+    return session.read_router is not None and session.read_router.use_replica(token_subject(request))
 
-def get_db() -> Generator:
+def get_db(request: Request) -> Generator:
+    # Marked before the write too, so a read racing the response can't see the replica
+    _mark_write(request)
     try:
         db = SessionLocal()
         yield db
     finally:
         db.close()
+        _mark_write(request)
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(reusable_oauth2)
-) -> User:
+def get_read_sessionmaker(request: Request) -> sessionmaker:
+    """SessionLocal for the replica or the primary, for endpoints that open their own sessions."""
+    return session.ReadSessionLocal if _read_from_replica(request) else SessionLocal
+
+def get_read_db(factory: sessionmaker = Depends(get_read_sessionmaker)) -> Generator:
+    """
+    Session for endpoints that only read: the replica when one is configured
+    and healthy, unless this caller wrote recently; otherwise the primary.
+    """
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    if session.AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires USE_ASYNC_DB=true")
+    _mark_write(request)
+    try:
+        async with session.AsyncSessionLocal() as db:
+            yield db
+    finally:
+        _mark_write(request)
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """get_read_db for async endpoints."""
+    if session.AsyncSessionLocal is None:
+        raise RuntimeError("Async database access requires USE_ASYNC_DB=true")
+    factory = session.AsyncReadSessionLocal if _read_from_replica(request) else session.AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+def _decode_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -37,23 +87,124 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = crud_user.user.get(db, id=token_data.sub)
+    if token_data.sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    return token_data
+
+def token_subject(request: Request) -> Optional[str]:
+    """The user id in the request's bearer token, or None without a valid one (no query)."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return str(_decode_token(token).sub)
+    except HTTPException:
+        return None
+
+class IdempotentRoute(idempotency.IdempotentRoute):
+    """Idempotency-Key support for /api/v1 routers, scoped to the token's user id."""
+
+    def caller_id(self, request: Request) -> Optional[str]:
+        return token_subject(request)
+
+def _user_from_claims(token_data: TokenPayload) -> Optional[CurrentUser]:
+    if not settings.AUTH_CLAIMS_IN_TOKEN or token_data.is_active is None:
+        return None
+    return CurrentUser(
+        id=token_data.sub,
+        is_active=token_data.is_active,
+        is_superuser=bool(token_data.is_superuser),
+    )
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(reusable_oauth2)
+) -> CurrentUser:
+    token_data = _decode_token(token)
+    user = _user_from_claims(token_data) or crud_user.user.get_current(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=400, detail="The user doesn't have enough privileges"
         )
-    return current_user 
\ No newline at end of file
+    return current_user
+
+def get_current_stream_user(
+    token: Optional[str] = Depends(optional_oauth2),
+    access_token: Optional[str] = Query(
+        None, description="Bearer token, for EventSource clients that cannot send headers"
+    ),
+) -> CurrentUser:
+    """
+    Active user for long-lived streams. The session is closed before the
+    stream starts instead of being held for its whole life.
+    """
+    if not (token or access_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    token_data = _decode_token(token or access_token)
+    user = _user_from_claims(token_data)
+    if user is None:
+        with SessionLocal() as db:
+            user = crud_user.user.get_current(db, id=token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(reusable_oauth2)
+) -> CurrentUser:
+    token_data = _decode_token(token)
+    user = _user_from_claims(token_data) or await crud_user.user.aget_current(db, id=token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+async def get_current_active_user_async(
+    current_user: CurrentUser = Depends(get_current_user_async),
+) -> CurrentUser:
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+def expand_param(allowed: Collection[str]) -> Callable[..., FrozenSet[str]]:
+    """
+    Dependency parsing ``?expand=a,b`` into a set of relationship names,
+    rejecting names not in ``allowed`` with a 400.
+    """
+    def parse(
+        expand: Optional[str] = Query(
+            None, description=f"Comma-separated relationships to nest: {', '.join(allowed)}"
+        ),
+    ) -> FrozenSet[str]:
+        names = frozenset(name.strip() for name in (expand or "").split(",") if name.strip())
+        unknown = names - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot expand: {', '.join(sorted(unknown))}",
+            )
+        return names
+    return parse
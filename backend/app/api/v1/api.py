@@ -1,9 +1,37 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, warehouses, inventory
+from app.api.v1.endpoints import auth, users, warehouses, inventory, inventory_async, inventory_pipeline, dashboard, analytics, events, metrics
+from app.core.cache import configure_invalidation
+from app.core.config import settings
+from app.core.idempotency import DatabaseIdempotencyStore, MemoryIdempotencyStore, configure_idempotency
+from app.core.push import PostgresPushBus, PushBus, configure_push
+from app.core.responses import FastJSONResponse
 
-api_router = APIRouter()
+configure_invalidation(settings.CACHE_INVALIDATION_URL)
+configure_push(
+    PostgresPushBus(settings.SQLALCHEMY_DATABASE_URI) if settings.PUSH_BROADCAST == "postgres" else PushBus()
+)
+if settings.IDEMPOTENCY_STORE == "memory":
+    configure_idempotency(MemoryIdempotencyStore(ttl=settings.IDEMPOTENCY_TTL_SECONDS))
+else:
+    from app.db.session import engine
+    from app.models.idempotency import IdempotencyKey
+
+    configure_idempotency(
+        DatabaseIdempotencyStore(engine, IdempotencyKey.__table__, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
+    )
+
+api_router = APIRouter(default_response_class=FastJSONResponse)
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(warehouses.router, prefix="/warehouses", tags=["warehouses"])
-api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"]) 
\ No newline at end of file
+if settings.MOVEMENT_PIPELINE_ENABLED:
+    api_router.include_router(inventory_pipeline.router, prefix="/inventory", tags=["inventory"])
+if settings.USE_ASYNC_DB:
+    # Registered first so the async handlers win for the paths they define
+    api_router.include_router(inventory_async.router, prefix="/inventory", tags=["inventory"])
+api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta
+from typing import Any, List, Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.crud import crud_analytics
+from app.models.inventory import MovementType
+from app.schemas.analytics import DailyThroughput, ItemThroughput
+
+router = APIRouter()
+
+def date_range(start: Optional[date] = None, end: Optional[date] = None) -> Tuple[date, date]:
+    """Inclusive day range; defaults to the last ANALYTICS_DEFAULT_DAYS days (UTC)."""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=settings.ANALYTICS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= settings.ANALYTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Date range is limited to {settings.ANALYTICS_MAX_DAYS} days"
+        )
+    return start, end
+
+@router.get("/movements/daily", response_model=List[DailyThroughput])
+def read_daily_throughput(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    days: Tuple[date, date] = Depends(date_range),
+    movement_type: Optional[MovementType] = None,
+    item_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    per_warehouse: bool = False,
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Units moved and movement counts per day and movement type, read from
+    the daily rollups; ``per_warehouse`` splits each day by warehouse.
+
+    Movements are attributed to the location whose stock they changed (the
+    source of outbound movements, the destination otherwise).
+    """
+    start, end = days
+    return crud_analytics.daily_throughput(
+        db,
+        start=start,
+        end=end,
+        movement_type=movement_type,
+        item_id=item_id,
+        location_id=location_id,
+        warehouse_id=warehouse_id,
+        per_warehouse=per_warehouse,
+    )
+
+@router.get("/movements/top-items", response_model=List[ItemThroughput])
+def read_top_items(
+    *,
+    db: Session = Depends(deps.get_read_db),
+    days: Tuple[date, date] = Depends(date_range),
+    movement_type: Optional[MovementType] = None,
+    location_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    order_by: Literal["movements", "quantity"] = "movements",
+    limit: int = 20,
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Items ranked by movement count (or units moved) over the range, read
+    from the daily rollups.
+    """
+    start, end = days
+    return crud_analytics.top_items(
+        db,
+        start=start,
+        end=end,
+        movement_type=movement_type,
+        location_id=location_id,
+        warehouse_id=warehouse_id,
+        order_by=order_by,
+        limit=min(limit, 1000),
+    )
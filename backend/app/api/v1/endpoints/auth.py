@@ -6,8 +6,9 @@ from sqlalchemy.orm import Session
 
 from app.core import security
 from app.core.config import settings
+from app.core.hashing import PasswordHasherBusy
 from app.api import deps
-from app.schemas.user import Token, User
+from app.schemas.user import Token, User, UserCreate
 from app.crud import crud_user
 
 router = APIRouter()
@@ -20,9 +21,12 @@ def login(
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud_user.user.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    try:
+        user = crud_user.user.authenticate(
+            db, email=form_data.username, password=form_data.password
+        )
+    except PasswordHasherBusy:
+        raise _busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,7 +40,7 @@ def login(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            security.user_claims(user), expires_delta=access_token_expires
         ),
         "token_type": "bearer",
     }
@@ -56,5 +60,15 @@ def register(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
-    user = crud_user.user.create(db, obj_in=user_in)
-    return user 
\ No newline at end of file
+    try:
+        user = crud_user.user.create(db, obj_in=user_in)
+    except PasswordHasherBusy:
+        raise _busy()
+    return user
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password operations, please retry",
+        headers={"Retry-After": "1"},
+    ) 
\ No newline at end of file
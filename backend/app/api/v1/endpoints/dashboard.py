@@ -0,0 +1,19 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.crud import crud_stats
+from app.schemas.dashboard import DashboardStats
+
+router = APIRouter()
+
+@router.get("/stats", response_model=DashboardStats)
+def read_dashboard_stats(
+    db: Session = Depends(deps.get_read_db),
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Dashboard totals, read from the incrementally maintained counters.
+    """
+    return crud_stats.get_dashboard_stats(db)
@@ -0,0 +1,28 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api import deps
+from app.core.config import settings
+from app.core.push import broker, event_stream
+
+router = APIRouter()
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_events(
+    warehouse_id: Optional[int] = None,
+    current_user: Any = Depends(deps.get_current_stream_user),
+) -> Any:
+    """
+    Server-Sent Events for committed changes: item_quantity, movement_created
+    and location_created/updated/deleted, optionally only those concerning
+    ``warehouse_id``. Authenticate with the Authorization header or, from
+    EventSource, ``?access_token=``.
+    """
+    subscription = broker.subscribe(warehouse_id, queue_size=settings.PUSH_QUEUE_SIZE)
+    return StreamingResponse(
+        event_stream(subscription, keepalive=settings.PUSH_KEEPALIVE_SECONDS),
+        media_type="text/event-stream",
+        # Keep proxies from buffering or caching the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
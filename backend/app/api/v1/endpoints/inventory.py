@@ -1,31 +1,56 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, FrozenSet, List, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.api import deps
-from app.crud import crud_inventory
+from app.core.conditional import conditional_get
+from app.core.export import export_response
+from app.core.pagination import Cursor, cursor_param, set_next_cursor
+from app.core.responses import trusted_json_response
+from app.crud import crud_inventory, crud_low_stock
+from app.models.inventory import MovementType
 from app.schemas.inventory import (
     InventoryItem,
     InventoryItemCreate,
+    InventoryImportResult,
     InventoryItemUpdate,
+    LowStockItem,
     StockMovement,
     StockMovementCreate,
+    StockMovementExpanded,
+    StockMovementBatchCreate,
+    StockMovementBatchResponse,
 )
 
-router = APIRouter()
+router = APIRouter(route_class=deps.IdempotentRoute)
 
 @router.get("/items", response_model=List[InventoryItem])
 def read_items(
-    db: Session = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[Cursor] = Depends(cursor_param),
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve inventory items.
+    Retrieve inventory items. Supports If-None-Match.
     """
-    items = crud_inventory.inventory_item.get_multi(db, skip=skip, limit=limit)
-    return items
+    not_modified = conditional_get(
+        request, response, "inventory/items", crud_inventory.inventory_item.version(db)
+    )
+    if not_modified:
+        return not_modified
+    items = crud_inventory.inventory_item.get_multi_rows(
+        db, schema=InventoryItem, skip=skip, limit=limit, after=after
+    )
+    set_next_cursor(response, items, limit)
+    return trusted_json_response(response, InventoryItem, items)
 
 @router.post("/items", response_model=InventoryItem)
 def create_item(
@@ -46,10 +71,49 @@ def create_item(
     item = crud_inventory.inventory_item.create(db, obj_in=item_in)
     return item
 
+@router.post("/items/import", response_model=InventoryImportResult)
+def import_items(
+    *,
+    db: Session = Depends(deps.get_db),
+    file: UploadFile = File(..., description="CSV with name, barcode, location_code[, quantity, min_quantity, description]"),
+    warehouse_id: Optional[int] = None,
+    dry_run: bool = False,
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bulk create inventory items from a CSV upload.
+
+    Valid rows are inserted in one transaction and every rejected row is
+    reported; ``dry_run`` only validates. ``warehouse_id`` scopes location
+    codes when the same code exists in several warehouses.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    try:
+        missing = set(crud_inventory.IMPORT_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise HTTPException(
+                status_code=400,
+                detail=f"CSV is missing columns: {', '.join(sorted(missing))}",
+            )
+        return crud_inventory.inventory_item.bulk_import(
+            db, rows=reader, warehouse_id=warehouse_id, dry_run=dry_run
+        )
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Unreadable CSV: {e}")
+    except IntegrityError:
+        # A barcode was created (or a location deleted) by another request after
+        # bulk_import checked it; nothing was imported, and a retry reports the row
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Another request changed these items or locations during the import. Nothing was imported; retry it.",
+        )
+
 @router.get("/items/{item_id}", response_model=InventoryItem)
 def read_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     item_id: int,
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> Any:
@@ -81,17 +145,17 @@ def update_item(
 @router.get("/items/search/{name}", response_model=List[InventoryItem])
 def search_items(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     name: str,
     skip: int = 0,
     limit: int = 100,
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Search inventory items by name.
+    Search inventory items by name or barcode, best matches first.
     """
-    items = crud_inventory.inventory_item.search_by_name(
-        db, name=name, skip=skip, limit=limit
+    items = crud_inventory.inventory_item.search(
+        db, term=name, skip=skip, limit=limit
     )
     return items
 
@@ -105,7 +169,7 @@ def get_item_by_barcode(
     """
     Get inventory item by barcode.
     """
-    item = crud_inventory.inventory_item.get_by_barcode(db, barcode=barcode)
+    item = crud_inventory.inventory_item.get_cached_by_barcode(db, barcode=barcode)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
@@ -128,19 +192,103 @@ def create_stock_movement(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/movements/item/{item_id}", response_model=List[StockMovement])
-def read_item_movements(
+@router.post("/movements/batch", response_model=StockMovementBatchResponse)
+def create_stock_movements_batch(
     *,
     db: Session = Depends(deps.get_db),
+    batch_in: StockMovementBatchCreate,
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create many stock movements in one transaction, reporting each row's outcome.
+    """
+    results = crud_inventory.stock_movement.create_batch(
+        db, objs_in=batch_in.movements, user_id=current_user.id
+    )
+    created = sum(1 for movement, _ in results if movement is not None)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": [
+            {"index": index, "success": movement is not None, "movement": movement, "error": error}
+            for index, (movement, error) in enumerate(results)
+        ],
+    }
+
+@router.get("/movements/export")
+def export_stock_movements(
+    *,
+    format: Literal["csv", "ndjson"] = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    item_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    movement_type: Optional[MovementType] = None,
+    read_sessions: sessionmaker = Depends(deps.get_read_sessionmaker),
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Stream the movement history as CSV or NDJSON, oldest first.
+
+    ``location_id`` matches either side of a movement; ``end`` is exclusive.
+    """
+    stmt = crud_inventory.stock_movement.export_query(
+        start=start,
+        end=end,
+        item_id=item_id,
+        location_id=location_id,
+        movement_type=movement_type,
+    )
+    return export_response(read_sessions, stmt, format, f"stock-movements-{date.today():%Y%m%d}")
+
+@router.get("/low-stock", response_model=List[LowStockItem])
+def read_low_stock_items(
+    *,
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
+    warehouse_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Items whose quantity is below their min_quantity, longest first.
+
+    Reads the low-stock set maintained by the write path, so the cost
+    depends on how many items are low, not on the size of the catalog.
+    """
+    items = crud_low_stock.get_multi(
+        db, warehouse_id=warehouse_id, location_id=location_id, skip=skip, limit=limit
+    )
+    return trusted_json_response(response, LowStockItem, items)
+
+@router.get("/movements/item/{item_id}", response_model=List[StockMovementExpanded])
+def read_item_movements(
+    *,
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     item_id: int,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[Cursor] = Depends(cursor_param),
+    expand: FrozenSet[str] = Depends(deps.expand_param(crud_inventory.MOVEMENT_EXPANSIONS)),
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve stock movements for an item.
+    Retrieve stock movements for an item, newest first.
+
+    ``expand`` nests the related item, locations and user in each row.
     """
+    if not expand:
+        # Nothing to nest: read flat rows instead of ORM instances
+        movements = crud_inventory.stock_movement.get_multi_rows_by_item(
+            db, item_id=item_id, schema=StockMovementExpanded, skip=skip, limit=limit, after=after
+        )
+        set_next_cursor(response, movements, limit)
+        return trusted_json_response(response, StockMovementExpanded, movements)
     movements = crud_inventory.stock_movement.get_multi_by_item(
-        db, item_id=item_id, skip=skip, limit=limit
+        db, item_id=item_id, skip=skip, limit=limit, after=after, expand=expand
     )
+    set_next_cursor(response, movements, limit)
     return movements 
\ No newline at end of file
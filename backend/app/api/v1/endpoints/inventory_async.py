@@ -0,0 +1,124 @@
+"""
+Async versions of the hot inventory endpoints.
+
+Mounted ahead of the sync router when USE_ASYNC_DB is enabled, so these
+handlers serve the same paths on the event loop instead of the threadpool.
+"""
+from typing import Any, FrozenSet, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.conditional import conditional_get
+from app.core.pagination import Cursor, cursor_param, set_next_cursor
+from app.core.responses import trusted_json_response
+from app.crud import crud_inventory
+from app.schemas.inventory import (
+    InventoryItem,
+    StockMovement,
+    StockMovementCreate,
+    StockMovementExpanded,
+)
+
+router = APIRouter(route_class=deps.IdempotentRoute)
+
+@router.get("/items", response_model=List[InventoryItem])
+async def read_items_async(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = Depends(cursor_param),
+    current_user: Any = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve inventory items. Supports If-None-Match.
+    """
+    not_modified = conditional_get(
+        request, response, "inventory/items", await crud_inventory.inventory_item.aversion(db)
+    )
+    if not_modified:
+        return not_modified
+    items = await crud_inventory.inventory_item.aget_multi_rows(
+        db, schema=InventoryItem, skip=skip, limit=limit, after=after
+    )
+    set_next_cursor(response, items, limit)
+    return trusted_json_response(response, InventoryItem, items)
+
+@router.get("/items/{item_id}", response_model=InventoryItem)
+async def read_item_async(
+    *,
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    item_id: int,
+    current_user: Any = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Get inventory item by ID.
+    """
+    item = await crud_inventory.inventory_item.aget(db, id=item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+@router.get("/items/barcode/{barcode}", response_model=InventoryItem)
+async def get_item_by_barcode_async(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    barcode: str,
+    current_user: Any = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Get inventory item by barcode.
+    """
+    item = await crud_inventory.inventory_item.aget_cached_by_barcode(db, barcode=barcode)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return item
+
+@router.post("/movements", response_model=StockMovement)
+async def create_stock_movement_async(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    movement_in: StockMovementCreate,
+    current_user: Any = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Create new stock movement.
+    """
+    try:
+        return await crud_inventory.stock_movement.acreate_with_item_update(
+            db, obj_in=movement_in, user_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/movements/item/{item_id}", response_model=List[StockMovementExpanded])
+async def read_item_movements_async(
+    *,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    item_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Cursor] = Depends(cursor_param),
+    expand: FrozenSet[str] = Depends(deps.expand_param(crud_inventory.MOVEMENT_EXPANSIONS)),
+    current_user: Any = Depends(deps.get_current_active_user_async),
+) -> Any:
+    """
+    Retrieve stock movements for an item, newest first.
+
+    ``expand`` nests the related item, locations and user in each row.
+    """
+    if not expand:
+        # Nothing to nest: read flat rows instead of ORM instances
+        movements = await crud_inventory.stock_movement.aget_multi_rows_by_item(
+            db, item_id=item_id, schema=StockMovementExpanded, skip=skip, limit=limit, after=after
+        )
+        set_next_cursor(response, movements, limit)
+        return trusted_json_response(response, StockMovementExpanded, movements)
+    movements = await crud_inventory.stock_movement.aget_multi_by_item(
+        db, item_id=item_id, skip=skip, limit=limit, after=after, expand=expand
+    )
+    set_next_cursor(response, movements, limit)
+    return movements
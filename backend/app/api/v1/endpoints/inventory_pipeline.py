@@ -0,0 +1,53 @@
+"""
+Group-commit version of POST /inventory/movements.
+
+Mounted ahead of the other inventory routers when MOVEMENT_PIPELINE_ENABLED
+is set. Each request queues its movement on this worker's
+``movement_pipeline``, which applies everything queued together with
+StockMovement.create_many in one transaction; each request still gets its
+own movement back, or its own 400.
+"""
+from typing import Any, List, Sequence, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.api import deps
+from app.core.config import settings
+from app.core.group_commit import GroupCommitQueue
+from app.crud import crud_inventory
+from app.db.session import SessionLocal
+from app.schemas.inventory import StockMovement, StockMovementCreate
+
+def _apply_movements(entries: List[Tuple[StockMovementCreate, int]]) -> List[Any]:
+    with SessionLocal() as db:
+        results = crud_inventory.stock_movement.create_many(db, entries=entries)
+    return [movement if error is None else ValueError(error) for movement, error in results]
+
+async def apply_movements(entries: List[Tuple[StockMovementCreate, int]]) -> Sequence[Union[Any, Exception]]:
+    # One batch at a time, so the pipeline holds at most one connection
+    return await run_in_threadpool(_apply_movements, entries)
+
+movement_pipeline = GroupCommitQueue(
+    apply_movements,
+    name="movements",
+    max_batch=settings.MOVEMENT_PIPELINE_MAX_BATCH,
+    max_delay=settings.MOVEMENT_PIPELINE_MAX_DELAY_MS / 1000,
+)
+
+router = APIRouter(route_class=deps.IdempotentRoute, on_shutdown=[movement_pipeline.close])
+
+_current_user = deps.get_current_active_user_async if settings.USE_ASYNC_DB else deps.get_current_active_user
+
+@router.post("/movements", response_model=StockMovement)
+async def create_stock_movement_grouped(
+    *,
+    movement_in: StockMovementCreate,
+    current_user: Any = Depends(_current_user),
+) -> Any:
+    """
+    Create new stock movement.
+    """
+    try:
+        return await movement_pipeline.submit((movement_in, current_user.id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
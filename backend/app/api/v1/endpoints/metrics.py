@@ -0,0 +1,27 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.core.cache import cache_stats
+from app.db.pool import pool_status
+
+router = APIRouter()
+
+@router.get("/caches")
+def read_cache_stats(
+    current_user: Any = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Size, hit/miss counts and hit rate of every in-process cache.
+    """
+    return cache_stats()
+
+@router.get("/db-pool")
+def read_db_pool_stats(
+    current_user: Any = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Pool size, checked-out and overflow connections, and checkout wait
+    histogram for every engine in this process.
+    """
+    return pool_status()
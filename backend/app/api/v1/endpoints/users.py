@@ -0,0 +1,22 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.crud import crud_user
+from app.schemas.user import User
+
+router = APIRouter()
+
+@router.get("/me", response_model=User)
+def read_user_me(
+    db: Session = Depends(deps.get_db),
+    current_user: Any = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get current user.
+    """
+    user = crud_user.user.get(db, id=current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
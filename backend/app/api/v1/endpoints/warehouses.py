@@ -1,9 +1,13 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.conditional import conditional_get
+from app.core.pagination import Cursor, cursor_param, set_next_cursor
+from app.core.responses import trusted_json_response
 from app.crud import crud_warehouse
+from app.models.warehouse import StorageLocation as StorageLocationModel
 from app.schemas.warehouse import (
     Warehouse,
     WarehouseCreate,
@@ -17,16 +21,29 @@ router = APIRouter()
 
 @router.get("/", response_model=List[Warehouse])
 def read_warehouses(
-    db: Session = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[Cursor] = Depends(cursor_param),
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve warehouses.
+    Retrieve warehouses. Supports If-None-Match (nested locations included).
     """
-    warehouses = crud_warehouse.warehouse.get_multi(db, skip=skip, limit=limit)
-    return warehouses
+    not_modified = conditional_get(
+        request,
+        response,
+        "warehouses",
+        crud_warehouse.warehouse.version(db),
+        crud_warehouse.storage_location.version(db),
+    )
+    if not_modified:
+        return not_modified
+    warehouses = crud_warehouse.warehouse.get_multi(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, warehouses, limit)
+    return trusted_json_response(response, Warehouse, warehouses)
 
 @router.post("/", response_model=Warehouse)
 def create_warehouse(
@@ -67,19 +84,31 @@ def update_warehouse(
 @router.get("/{warehouse_id}/locations", response_model=List[StorageLocation])
 def read_storage_locations(
     *,
-    db: Session = Depends(deps.get_db),
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_read_db),
     warehouse_id: int,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[Cursor] = Depends(cursor_param),
     current_user: Any = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve storage locations for a warehouse.
+    Retrieve storage locations for a warehouse. Supports If-None-Match.
     """
-    locations = crud_warehouse.storage_location.get_multi_by_warehouse(
-        db, warehouse_id=warehouse_id, skip=skip, limit=limit
+    not_modified = conditional_get(
+        request,
+        response,
+        f"warehouses/{warehouse_id}/locations",
+        crud_warehouse.storage_location.version(db, StorageLocationModel.warehouse_id == warehouse_id),
+    )
+    if not_modified:
+        return not_modified
+    locations = crud_warehouse.storage_location.get_multi_rows_by_warehouse(
+        db, warehouse_id=warehouse_id, schema=StorageLocation, skip=skip, limit=limit, after=after
     )
-    return locations
+    set_next_cursor(response, locations, limit)
+    return trusted_json_response(response, StorageLocation, locations)
 
 @router.post("/{warehouse_id}/locations", response_model=StorageLocation)
 def create_storage_location(
@@ -1,8 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer
 import os
+from app.core import idempotency
+from app.core.cache import TTLCache
 from app.database import get_db
 from app.models import User
 
@@ -11,6 +15,18 @@ ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+@dataclass(frozen=True)
+class CachedUser:
+    id: int
+    email: str
+
+# Token subject (email) -> CachedUser, so routes don't query users on every request
+user_cache = TTLCache(
+    "legacy_users",
+    maxsize=int(os.environ.get("USER_CACHE_MAX_SIZE", "10000")),
+    ttl=float(os.environ.get("USER_CACHE_TTL_SECONDS", "60")),
+)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -24,7 +40,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        db_user = db.query(User).filter(User.email == email).first()
+        if db_user is None:
+            raise credentials_exception
+        user = CachedUser(id=db_user.id, email=db_user.email)
+        user_cache.set(email, user)
     return user
+
+def token_subject(request: Request) -> Optional[str]:
+    """The email in the request's bearer token, or None without a valid one (no query)."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+class IdempotentRoute(idempotency.IdempotentRoute):
+    """Idempotency-Key support for the legacy routers, scoped to the token's subject."""
+
+    def caller_id(self, request: Request) -> Optional[str]:
+        # The item routes take no credentials, so anonymous callers share one scope
+        return token_subject(request) or ""
@@ -0,0 +1,180 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Every cache registers itself here so its counters can be exported
+CACHES: Dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """
+    Thread-safe, bounded LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Values are per process: anything that must stay coherent across workers
+    needs explicit invalidation or a short enough TTL.
+    """
+
+    def __init__(self, name: str, *, maxsize: int = 1024, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key`` in this process only; see ``invalidate`` below for all workers."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+def _stat_gauge(field: str):
+    return lambda: {(name,): stats[field] for name, stats in cache_stats().items()}
+
+Gauge("cache_hits", "Cache hits since start", _stat_gauge("hits"), labelnames=("cache",))
+Gauge("cache_misses", "Cache misses since start", _stat_gauge("misses"), labelnames=("cache",))
+Gauge("cache_entries", "Entries currently cached", _stat_gauge("size"), labelnames=("cache",))
+
+class InvalidationBus:
+    """
+    Delivers cache invalidations. This in-process stand-in only reaches the
+    current worker; RedisInvalidationBus fans them out to every worker.
+    """
+
+    def publish(self, cache: str, keys: Iterable[Hashable]) -> None:
+        self.apply(cache, keys)
+
+    def apply(self, cache: str, keys: Iterable[Hashable]) -> None:
+        target = CACHES.get(cache)
+        if target is None:
+            return
+        for key in keys:
+            target.invalidate(key)
+
+class RedisInvalidationBus(InvalidationBus):
+    """
+    Broadcasts invalidations over Redis pub/sub (requires the ``redis``
+    package). Each worker still serves hits from its own TTLCache; if Redis
+    is unreachable, peers fall back on the TTL.
+    """
+    channel = "wms:cache-invalidation"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self._origin = uuid.uuid4().hex
+        threading.Thread(target=self._listen, name="cache-invalidation", daemon=True).start()
+
+    def publish(self, cache: str, keys: Iterable[Hashable]) -> None:
+        keys = list(keys)
+        self.apply(cache, keys)
+        message = json.dumps({"origin": self._origin, "cache": cache, "keys": keys})
+        try:
+            self._client.publish(self.channel, message)
+        except self._redis.RedisError:
+            logger.warning("Could not publish invalidation for cache %s", cache, exc_info=True)
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    try:
+                        payload = json.loads(message["data"])
+                        if payload["origin"] != self._origin:
+                            self.apply(payload["cache"], payload["keys"])
+                    except Exception:
+                        # A bad message must not end the subscription
+                        logger.exception("Could not apply cache invalidation %r", message.get("data"))
+            except self._redis.RedisError:
+                logger.warning("Cache invalidation subscription lost, retrying", exc_info=True)
+                time.sleep(1)
+
+invalidation_bus: InvalidationBus = InvalidationBus()
+
+def configure_invalidation(url: Optional[str]) -> None:
+    """Use Redis at ``url`` to broadcast invalidations, or stay in-process if None."""
+    global invalidation_bus
+    invalidation_bus = RedisInvalidationBus(url) if url else InvalidationBus()
+
+def invalidate(cache: TTLCache, *keys: Hashable) -> None:
+    """Drop ``keys`` from ``cache`` in every worker reached by the invalidation bus."""
+    if keys:
+        invalidation_bus.publish(cache.name, keys)
+
+_PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+def invalidate_on_commit(db: Any, cache: TTLCache, *keys: Hashable) -> None:
+    """
+    Invalidate ``keys`` once ``db`` (a Session or AsyncSession) commits, so
+    readers can't re-cache the old value in between.
+    """
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault(_PENDING_INVALIDATIONS, []).append((cache, keys))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for cache, keys in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        invalidate(cache, *keys)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
@@ -0,0 +1,59 @@
+"""
+Conditional GET support (ETag / Last-Modified) for collection endpoints.
+
+A collection's version is its row count and max(updated_at), read with one
+query: whole tables take the count from their stat counter and the maximum
+from their updated_at index, filtered subsets count through an index on the
+filter column. The ETag also covers the query string, so each page of a
+listing validates separately. Matching requests get a 304 before any rows
+are loaded or serialized.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Iterable, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+
+# (row count, max(updated_at)) of one table or filtered subset
+Version = Tuple[int, Optional[datetime]]
+
+def _etag(key: str, versions: Sequence[Version], query: str) -> str:
+    raw = repr((key, [(count, updated and updated.isoformat()) for count, updated in versions], query))
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+def _tags(header: str) -> Iterable[str]:
+    for tag in header.split(","):
+        tag = tag.strip()
+        # Weak comparison: W/"x" matches "x"
+        yield tag[2:] if tag.startswith("W/") else tag
+
+def _last_modified(versions: Sequence[Version]) -> Optional[datetime]:
+    stamps = [updated for _, updated in versions if updated is not None]
+    if not stamps:
+        return None
+    # updated_at is stored as naive UTC; HTTP dates have one-second resolution
+    return max(stamps).replace(tzinfo=timezone.utc, microsecond=0)
+
+def conditional_get(
+    request: Request, response: Response, key: str, *versions: Version
+) -> Optional[Response]:
+    """
+    Set ETag/Last-Modified on ``response`` and return a 304 response if the
+    client's If-None-Match is current, else None.
+
+    If-Modified-Since alone is not honoured: deleting a row leaves
+    max(updated_at) unchanged, so only the ETag (which includes the count)
+    reliably detects it.
+    """
+    etag = _etag(key, versions, request.url.query)
+    last_modified = _last_modified(versions)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag[2:] in _tags(if_none_match)):
+        return Response(status_code=304, headers=headers)
+    return None
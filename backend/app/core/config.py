@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
 
@@ -13,6 +13,36 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Carry is_active/is_superuser as signed claims so auth needs no user lookup.
+    # Changes to those flags then only apply once the user's token is reissued.
+    AUTH_CLAIMS_IN_TOKEN: bool = False
+    # Created by app.db.init_db if missing
+    FIRST_SUPERUSER_EMAIL: str = "admin@example.com"
+    FIRST_SUPERUSER_PASSWORD: str = "changeme"  # Change this in production
+
+    # Password hashing runs on its own process pool (0 workers = inline)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
+
+    # Authenticated-user cache (per process, invalidated by CRUDUser writes)
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Barcode -> item cache for scan lookups (invalidated by item writes and movements)
+    BARCODE_CACHE_TTL_SECONDS: float = 30.0
+    BARCODE_CACHE_MAX_SIZE: int = 50000
+    # redis:// URL used to broadcast cache invalidations to every worker
+    CACHE_INVALIDATION_URL: Optional[str] = None
+    # Stored responses for Idempotency-Key retries: "database" (shared by all
+    # workers) or "memory" (per process, for tests)
+    IDEMPOTENCY_STORE: str = "database"
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    # Server-Sent Events (/events/stream): "local" reaches clients of the worker
+    # that committed the change, "postgres" broadcasts to every worker over
+    # LISTEN/NOTIFY on SQLALCHEMY_DATABASE_URI
+    PUSH_BROADCAST: str = "local"
+    PUSH_QUEUE_SIZE: int = 1000
+    PUSH_KEEPALIVE_SECONDS: float = 15.0
     
     # Database Configuration
     POSTGRES_SERVER: str = "localhost"
@@ -20,6 +50,42 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "wms"
     SQLALCHEMY_DATABASE_URI: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
+    # Async mode: hot inventory endpoints run on an AsyncEngine. The async URL
+    # defaults to SQLALCHEMY_DATABASE_URI with the asyncpg/aiosqlite driver.
+    USE_ASYNC_DB: bool = False
+    ASYNC_SQLALCHEMY_DATABASE_URI: Optional[str] = None
+    # Connection pool (per engine, per worker process)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Set when connecting through PgBouncer in transaction pooling mode
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
+    # Read replica for GET endpoints (get_read_db). Reads fall back to the
+    # primary while the replica is unreachable or over REPLICA_MAX_LAG_SECONDS
+    # behind, and for REPLICA_STICKY_SECONDS after the same user's write to
+    # the same worker process (best effort: other workers don't see it).
+    SQLALCHEMY_READ_REPLICA_URI: Optional[str] = None
+    ASYNC_SQLALCHEMY_READ_REPLICA_URI: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    REPLICA_STICKY_SECONDS: float = 10.0
+    # Group commit: POST /inventory/movements requests are queued and applied
+    # together, one transaction per batch of up to MOVEMENT_PIPELINE_MAX_BATCH
+    # movements or MOVEMENT_PIPELINE_MAX_DELAY_MS after the first one arrives
+    MOVEMENT_PIPELINE_ENABLED: bool = False
+    MOVEMENT_PIPELINE_MAX_BATCH: int = 200
+    MOVEMENT_PIPELINE_MAX_DELAY_MS: float = 5.0
+
+    # Dashboard counters
+    STAT_COUNTER_SHARDS: int = 8
+    RECENT_MOVEMENT_DAYS: int = 7
+    STAT_RECONCILE_INTERVAL_SECONDS: int = 300
+
+    # Movement analytics (daily rollups)
+    ANALYTICS_DEFAULT_DAYS: int = 90
+    ANALYTICS_MAX_DAYS: int = 731
 
     class Config:
         case_sensitive = True
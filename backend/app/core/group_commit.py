@@ -0,0 +1,117 @@
+"""
+Group commit: many small writes applied in one transaction.
+
+Callers ``await queue.submit(entry)``. One worker task per event loop
+collects submissions until ``max_batch`` are waiting or ``max_delay``
+seconds have passed since the first, hands the whole batch to ``apply`` and
+resolves each caller's future with its own element of the returned list: a
+result, or an exception to raise in that caller. If ``apply`` itself raises,
+every caller in the batch gets that exception.
+
+Batches are applied one at a time, so the next batch fills up while the
+current one commits. A caller that gives up (client disconnect) does not
+withdraw its entry; it is still applied with the rest of its batch.
+"""
+import asyncio
+import contextlib
+import time
+from typing import Awaitable, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from app.core.metrics import Histogram
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+batch_size = Histogram(
+    "group_commit_batch_size",
+    "Entries applied per group commit",
+    labelnames=("queue",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+apply_duration = Histogram(
+    "group_commit_apply_seconds",
+    "Time spent applying one group commit",
+    labelnames=("queue",),
+)
+
+class GroupCommitQueue(Generic[T, R]):
+    """
+    ``apply(entries)`` must return one result or exception per entry, in
+    order. The queue binds to the event loop of its first ``submit``.
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[List[T]], Awaitable[Sequence[Union[R, BaseException]]]],
+        *,
+        name: str,
+        max_batch: int = 200,
+        max_delay: float = 0.005,
+    ):
+        self.apply = apply
+        self.name = name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: "Optional[asyncio.Queue[Tuple[T, asyncio.Future]]]" = None
+        self._full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._worker = loop.create_task(self._run(), name=f"group-commit-{self.name}")
+
+    async def submit(self, entry: T) -> R:
+        self._start()
+        future = self._loop.create_future()
+        self._queue.put_nowait((entry, future))
+        if self._queue.qsize() >= self.max_batch - 1:
+            # The worker holds one entry already; this completes a batch
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() + 1 < self.max_batch:
+                self._full.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._apply(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _apply(self, batch: List[Tuple[T, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        try:
+            results = await self.apply([entry for entry, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        apply_duration.observe(time.perf_counter() - started, queue=self.name)
+        batch_size.observe(len(batch), queue=self.name)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Apply whatever is queued, then stop the worker."""
+        worker = self._worker
+        if worker is None or worker.done() or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await worker
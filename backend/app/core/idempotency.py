@@ -0,0 +1,262 @@
+"""
+Idempotency-Key support for write endpoints.
+
+A client that may retry a write (scanners on flaky Wi-Fi) sends a unique
+``Idempotency-Key`` header. The first request with a key runs normally and
+its response is stored for ``ttl`` seconds. Retries with the same key, from
+the same caller, to the same method and path get the stored response back
+(marked ``Idempotent-Replayed: true``) without the endpoint running again,
+so a quantity change is applied at most once. Reusing a key with a different
+body is rejected with 422. A retry that arrives while the first request is
+still running gets 409.
+
+Routers opt in with ``APIRouter(route_class=...)`` and a subclass of
+IdempotentRoute that names the caller from its credentials. Only
+responses the endpoint returns are stored: if it raises (validation errors,
+HTTPException, server errors) the key is released and a retry runs again.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Coroutine, List, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import Table, delete, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+MAX_KEY_LENGTH = 255
+# Headers recomputed when a stored response is replayed
+_UNSTORED_HEADERS = frozenset({"content-length", "date", "server"})
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+# reserve() result: (True, None) when the caller now owns the key, (False, None)
+# while another request holds it, (False, response) once it has completed
+Reservation = Tuple[bool, Optional[StoredResponse]]
+
+class MemoryIdempotencyStore:
+    """
+    Per-process store, for tests and single-worker deployments.
+
+    ``pending_ttl`` bounds how long a reservation whose request never
+    finished blocks retries.
+    """
+
+    def __init__(self, ttl: float = 86400.0, pending_ttl: float = 60.0):
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Optional[StoredResponse]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+
+    def reserve(self, key: str) -> Reservation:
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return False, entry[1]
+            self._entries[key] = (now + self.pending_ttl, None)
+            self._entries.move_to_end(key)
+            return True, None
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+class DatabaseIdempotencyStore:
+    """
+    Store shared by every worker, in ``table`` (see the idempotency_keys
+    models). Each call is its own short transaction; expired rows are
+    purged at most once per ``purge_interval`` seconds per process.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        table: Table,
+        *,
+        ttl: float = 86400.0,
+        pending_ttl: float = 60.0,
+        purge_interval: float = 300.0,
+    ):
+        self.engine = engine
+        self.table = table
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+    def _purge(self, now: datetime) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.purge_interval
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.expires_at <= now))
+
+    def _insert(self, key: str, now: datetime) -> bool:
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(self.table).values(
+                    key=key, created_at=now, expires_at=now + timedelta(seconds=self.pending_ttl)
+                ))
+            return True
+        except IntegrityError:
+            return False
+
+    def reserve(self, key: str) -> Reservation:
+        now = datetime.utcnow()
+        self._purge(now)
+        if self._insert(key, now):
+            return True, None
+        t = self.table
+        with self.engine.begin() as conn:
+            row = conn.execute(select(t).where(t.c.key == key)).one_or_none()
+            if row is not None and row.expires_at <= now:
+                conn.execute(delete(t).where(t.c.key == key, t.c.expires_at <= now))
+                row = None
+        if row is None:
+            # Expired (or released) in between: claim it, unless another request just did
+            return (True, None) if self._insert(key, now) else (False, None)
+        if row.status_code is None:
+            return False, None
+        return False, StoredResponse(row.fingerprint, row.status_code, json.loads(row.headers), row.body)
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        t = self.table
+        with self.engine.begin() as conn:
+            conn.execute(update(t).where(t.c.key == key).values(
+                fingerprint=response.fingerprint,
+                status_code=response.status_code,
+                headers=json.dumps(response.headers),
+                body=response.body,
+                expires_at=datetime.utcnow() + timedelta(seconds=self.ttl),
+            ))
+
+    def release(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.key == key))
+
+idempotency_store = MemoryIdempotencyStore()
+
+def configure_idempotency(store) -> None:
+    """Install the process-wide store (MemoryIdempotencyStore or DatabaseIdempotencyStore)."""
+    global idempotency_store
+    idempotency_store = store
+
+def _scoped_key(request: Request, caller: str, key: str) -> str:
+    # A key only matches the same caller, method and path
+    scope = "\n".join((request.method, request.url.path, caller, key))
+    return hashlib.sha256(scope.encode()).hexdigest()
+
+def _replay(stored: StoredResponse) -> Response:
+    response = Response(content=stored.body, status_code=stored.status_code)
+    response.raw_headers.extend((name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+async def _release(store, key: str) -> None:
+    try:
+        await run_in_threadpool(store.release, key)
+    except Exception:
+        # Retries get 409 until the reservation's pending_ttl runs out
+        logger.exception("Could not release an idempotency key")
+
+class IdempotentRoute(APIRoute):
+    """
+    APIRoute that honours the Idempotency-Key header on unsafe methods.
+
+    Keys are scoped to ``caller_id``, the authenticated user, not to the
+    token itself, so a retry sent after logging in again or refreshing the
+    token still matches. Stored responses are replayed before the endpoint
+    runs, so caller_id must verify the credentials; requests it can't
+    identify run without idempotency and are left to the endpoint to reject.
+    """
+
+    def caller_id(self, request: Request) -> Optional[str]:
+        raise NotImplementedError(f"{type(self).__name__} must say who the caller is")
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            client_key = request.headers.get(IDEMPOTENCY_HEADER)
+            if client_key is None or request.method not in UNSAFE_METHODS:
+                return await handler(request)
+            if not client_key or len(client_key) > MAX_KEY_LENGTH:
+                return JSONResponse(
+                    {"detail": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"}, status_code=400
+                )
+            caller = self.caller_id(request)
+            if caller is None:
+                return await handler(request)
+            store = idempotency_store
+            key = _scoped_key(request, caller, client_key)
+            fingerprint = hashlib.sha256(await request.body()).hexdigest()
+            reserved, stored = await run_in_threadpool(store.reserve, key)
+            if not reserved:
+                if stored is None:
+                    return JSONResponse(
+                        {"detail": f"A request with this {IDEMPOTENCY_HEADER} is still being processed"},
+                        status_code=409,
+                    )
+                if stored.fingerprint != fingerprint:
+                    return JSONResponse(
+                        {"detail": f"{IDEMPOTENCY_HEADER} was already used with a different request"},
+                        status_code=422,
+                    )
+                return _replay(stored)
+
+            try:
+                response = await handler(request)
+            except BaseException:
+                await _release(store, key)
+                raise
+            body = getattr(response, "body", None)
+            if body is None or response.status_code >= 500:
+                # Streaming or failed: let the client retry for real
+                await _release(store, key)
+                return response
+            headers = [
+                (name.decode("latin-1"), value.decode("latin-1"))
+                for name, value in response.raw_headers
+                if name.decode("latin-1").lower() not in _UNSTORED_HEADERS
+            ]
+            try:
+                await run_in_threadpool(
+                    store.complete, key, StoredResponse(fingerprint, response.status_code, headers, bytes(body))
+                )
+            except Exception:
+                # The write itself succeeded; a retry will see the reservation expire
+                logger.exception("Could not store the response for an idempotency key")
+            return response
+
+        return idempotent_handler
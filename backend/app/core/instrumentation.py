@@ -0,0 +1,138 @@
+"""
+Request instrumentation: per-route latency histograms and SQL query
+counting/timing, with optional debug headers.
+"""
+import contextvars
+import time
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from starlette.responses import Response
+from starlette.routing import Match
+
+from app.core.metrics import Counter, Histogram, render
+
+DB_QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time"
+
+# Label used for requests that matched no route, so scanners can't explode cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    labelnames=("method", "route", "status"),
+)
+request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    labelnames=("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+request_db_time = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per HTTP request",
+    labelnames=("method", "route"),
+)
+db_queries = Counter("db_queries", "SQL statements executed")
+db_commits = Counter("db_commits", "Transactions committed")
+
+class RequestStats:
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+def instrument_engine(engine: Any) -> None:
+    """Count and time every statement ``engine`` (sync or async) executes."""
+    engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started: List[float] = conn.info.get("query_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        db_queries.inc()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        # so the connection's stack doesn't grow across the pool's lifetime
+        conn = context.connection
+        if conn is not None and context.execution_context is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        db_commits.inc()
+
+def _route_template(scope) -> str:
+    app = scope.get("app")
+    partial = None
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """
+    Records latency, query count and DB time per route template and status.
+
+    Sync endpoints run in a copy of the request's context, so the statement
+    listeners above update the same RequestStats object. With
+    ``debug_headers`` the counts are also returned as X-DB-Queries and
+    X-DB-Time (milliseconds).
+    """
+
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.debug_headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((DB_QUERIES_HEADER.lower().encode(), str(stats.queries).encode()))
+                    headers.append((DB_TIME_HEADER.lower().encode(), f"{stats.db_time * 1000:.2f}".encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = _route_template(scope)
+            method = scope["method"]
+            request_duration.observe(time.perf_counter() - started, method=method, route=route, status=str(status))
+            request_queries.observe(stats.queries, method=method, route=route)
+            request_db_time.observe(stats.db_time, method=method, route=route)
+
+def metrics_response() -> Response:
+    return Response(render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: int
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return Cursor(datetime.fromisoformat(created_at), int(id))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def cursor_param(
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from the X-Next-Cursor header of the previous page"
+    ),
+) -> Optional[Cursor]:
+    """FastAPI dependency that decodes the ``cursor`` query parameter."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def paginate(
+    query: Any,
+    created_col: Any,
+    id_col: Any,
+    *,
+    after: Optional[Cursor] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+) -> Any:
+    """
+    Order ``query`` by ``(created_col, id_col)`` and apply one page.
+
+    With a cursor the page starts right after it (keyset pagination), so
+    every page costs the same as the first; without one the legacy
+    ``skip``/``limit`` offset is used on the same stable ordering.
+    """
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+    if after is None:
+        return query.offset(skip).limit(limit)
+    if descending:
+        keyset = or_(
+            created_col < after.created_at,
+            and_(created_col == after.created_at, id_col < after.id),
+        )
+    else:
+        keyset = or_(
+            created_col > after.created_at,
+            and_(created_col == after.created_at, id_col > after.id),
+        )
+    return query.filter(keyset).limit(limit)
+
+def set_next_cursor(
+    response: Response, rows: List[Any], limit: int, created_attr: str = "created_at"
+) -> None:
+    """Expose the cursor for the page after ``rows`` when the page is full."""
+    if rows and len(rows) >= limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, created_attr), last.id)
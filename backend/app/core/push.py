@@ -0,0 +1,248 @@
+"""
+Server push of committed changes over Server-Sent Events.
+
+Writes describe what changed as events, ``{"type", "warehouse_ids",
+"data"}``, queued on their session with ``publish_on_commit`` and published
+only once it commits (dropped on rollback). ``push_bus`` carries them to
+every worker: the in-process stand-in only reaches the current one,
+PostgresPushBus fans out over LISTEN/NOTIFY. Each worker's ``broker`` then
+hands them to its subscribers, one per open stream. An event is encoded once
+and only queued for subscribers watching one of its warehouses (or all).
+
+A subscriber that falls ``queue_size`` events behind is dropped after a
+``reset`` event; EventSource reconnects on its own, and the client should
+refetch what it shows.
+"""
+import asyncio
+import logging
+import queue
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.metrics import Gauge
+from app.core.responses import ORJSON_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+Event = Dict[str, Any]
+
+# Tells EventSource how long to wait before reconnecting, in milliseconds
+RETRY_FRAME = b"retry: 3000\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+def encode_event(event: Event) -> bytes:
+    data = orjson.dumps(event["data"], option=ORJSON_OPTIONS)
+    return b"event: " + event["type"].encode() + b"\ndata: " + data + b"\n\n"
+
+class Subscription:
+    def __init__(self, warehouse_id: Optional[int], queue_size: int):
+        self.warehouse_id = warehouse_id
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(queue_size)
+
+class EventBroker:
+    """
+    Per-worker fan-out to the streams open on its event loop. ``publish``
+    may be called from any thread.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # warehouse_id (None = every warehouse) -> subscriptions
+        self._subscriptions: Dict[Optional[int], Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, warehouse_id: Optional[int] = None, queue_size: int = 1000) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(warehouse_id, queue_size)
+        self._subscriptions[warehouse_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.warehouse_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.warehouse_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in list(self._subscriptions.values()))
+
+    def publish(self, events: List[Event]) -> None:
+        loop = self._loop
+        if not events or loop is None or loop.is_closed() or not self._subscriptions:
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, events)
+        except RuntimeError:
+            # Loop closed in between
+            pass
+
+    def _deliver(self, events: List[Event]) -> None:
+        everyone = self._subscriptions.get(None, ())
+        for event in events:
+            targets = set(everyone)
+            for warehouse_id in event["warehouse_ids"]:
+                targets.update(self._subscriptions.get(warehouse_id, ()))
+            if not targets:
+                continue
+            frame = encode_event(event)
+            for subscription in targets:
+                try:
+                    subscription.queue.put_nowait(frame)
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(RESET_FRAME)
+
+broker = EventBroker()
+
+Gauge("push_subscribers", "Open event streams in this process", lambda: {(): broker.subscriber_count()})
+
+async def event_stream(subscription: Subscription, keepalive: float = 15.0) -> AsyncIterator[bytes]:
+    """The SSE body for ``subscription``; unsubscribes when the client goes away."""
+    try:
+        yield RETRY_FRAME
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscription.queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                frame = KEEPALIVE_FRAME
+            yield frame
+            if frame is RESET_FRAME:
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+class PushBus:
+    """
+    Delivers committed events. This in-process stand-in only reaches the
+    current worker; PostgresPushBus fans them out to every worker.
+    """
+
+    def publish(self, events: List[Event]) -> None:
+        broker.publish(events)
+
+class PostgresPushBus(PushBus):
+    """
+    Broadcasts events with NOTIFY on ``channel`` and LISTENs for the other
+    workers' (requires psycopg2). Notifications are sent from a background
+    thread, so committing never waits on them; if PostgreSQL is unreachable,
+    other workers' clients miss events until it is back.
+    """
+    channel = "wms_events"
+    # NOTIFY payloads must stay under 8000 bytes
+    max_payload = 7500
+
+    def __init__(self, url: str):
+        import psycopg2
+
+        self._psycopg2 = psycopg2
+        self._dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._origin = uuid.uuid4().hex
+        self._outbox: "queue.SimpleQueue[List[Event]]" = queue.SimpleQueue()
+        threading.Thread(target=self._notify, name="push-notify", daemon=True).start()
+        threading.Thread(target=self._listen, name="push-listen", daemon=True).start()
+
+    def publish(self, events: List[Event]) -> None:
+        broker.publish(events)
+        self._outbox.put(events)
+
+    def _connect(self):
+        connection = self._psycopg2.connect(self._dsn)
+        connection.autocommit = True
+        return connection
+
+    def _payloads(self, events: List[Event]) -> Iterator[str]:
+        head = b'{"origin":"' + self._origin.encode() + b'","events":['
+        chunk: List[bytes] = []
+        size = len(head)
+        for event in events:
+            encoded = orjson.dumps(event, option=ORJSON_OPTIONS)
+            if chunk and size + len(encoded) + 3 > self.max_payload:
+                yield (head + b",".join(chunk) + b"]}").decode()
+                chunk, size = [], len(head)
+            chunk.append(encoded)
+            size += len(encoded) + 1
+        if chunk:
+            yield (head + b",".join(chunk) + b"]}").decode()
+
+    def _notify(self) -> None:
+        connection = None
+        while True:
+            events = self._outbox.get()
+            while True:
+                # Coalesce whatever else is waiting into the same round trips
+                try:
+                    events = events + self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if connection is None or connection.closed:
+                    connection = self._connect()
+                with connection.cursor() as cursor:
+                    for payload in self._payloads(events):
+                        cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except self._psycopg2.Error:
+                logger.warning("Could not broadcast %d push events", len(events), exc_info=True)
+                connection = None
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                connection = self._connect()
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                while True:
+                    if select.select([connection], [], [], 5.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        try:
+                            payload = orjson.loads(notify.payload)
+                            if payload["origin"] != self._origin:
+                                broker.publish(payload["events"])
+                        except Exception:
+                            # A bad notification must not end the subscription
+                            logger.exception("Could not relay push events %r", notify.payload[:200])
+            except self._psycopg2.Error:
+                logger.warning("Push event subscription lost, retrying", exc_info=True)
+                time.sleep(1)
+
+push_bus: PushBus = PushBus()
+
+def configure_push(bus: PushBus) -> None:
+    """Install the process-wide bus (PushBus or PostgresPushBus)."""
+    global push_bus
+    push_bus = bus
+
+_PENDING_EVENTS = "pending_push_events"
+
+def publish_on_commit(db: Any, events: List[Event]) -> None:
+    """Publish ``events`` once ``db`` (a Session or AsyncSession) commits."""
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault(_PENDING_EVENTS, []).extend(events)
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    events = session.info.pop(_PENDING_EVENTS, None)
+    if events:
+        push_bus.publish(events)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS, None)
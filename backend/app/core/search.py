@@ -0,0 +1,37 @@
+from typing import Any
+
+from sqlalchemy import case, func, or_
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def ranked_search(query: Any, term: str, *, name_col: Any, barcode_col: Any, id_col: Any) -> Any:
+    """
+    Filter ``query`` to rows whose name or barcode matches ``term``, best first.
+
+    On PostgreSQL the substring and fuzzy (``%``) matches are served by the
+    pg_trgm GIN indexes from migration 0001 and ranked by trigram similarity.
+    Other databases (SQLite for local runs) fall back to LIKE with a simple
+    exact > prefix > substring rank. An exact barcode hit always comes first.
+    """
+    term = term.strip()
+    contains = f"%{escape_like(term)}%"
+    prefix = f"{escape_like(term)}%"
+    matches = [
+        name_col.ilike(contains, escape="\\"),
+        barcode_col.ilike(contains, escape="\\"),
+    ]
+    exact_barcode = case((barcode_col == term, 0), else_=1)
+    if query.session.get_bind().dialect.name == "postgresql":
+        matches.append(name_col.op("%")(term))
+        rank = func.greatest(
+            func.similarity(name_col, term), func.similarity(barcode_col, term)
+        ).desc()
+    else:
+        rank = case(
+            (func.lower(name_col) == term.lower(), 0),
+            (name_col.ilike(prefix, escape="\\"), 1),
+            (barcode_col.ilike(prefix, escape="\\"), 2),
+            else_=3,
+        )
+    return query.filter(or_(*matches)).order_by(exact_barcode, rank, id_col)
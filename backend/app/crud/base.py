@@ -1,8 +1,14 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import Row, func, null, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
 
+from app.core.conditional import Version
+from app.core.pagination import Cursor, paginate
+from app.crud import crud_stats
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -10,6 +16,11 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Listing order on (created_at, id); movement history reads newest first
+    newest_first: bool = False
+    # Dashboard counter kept in step with create/remove (see crud_stats)
+    counter_name: Optional[str] = None
+
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -23,14 +34,82 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        return self._paginate(db.query(self.model), skip=skip, limit=limit, after=after).all()
+
+    def select_rows(self, schema: Type[BaseModel], *criteria: Any) -> Select:
+        """
+        Core select of just the columns ``schema`` reads, plus the pagination
+        keys, labelled with the schema's field names.
+
+        The rows it returns are plain ``Row`` tuples with attribute access: no
+        ORM instances, identity map or change tracking, so bulk read-only
+        listings cost a fraction of ``get_multi``. Optional relationship
+        fields (``?expand=`` targets) come back as NULL; other nested fields
+        aren't supported.
+        """
+        table = self.model.__table__
+        relationships = self.model.__mapper__.relationships
+        columns = []
+        for name, field in schema.model_fields.items():
+            if name in table.c:
+                columns.append(table.c[name])
+            elif name in relationships and field.default is None:
+                columns.append(null().label(name))
+            else:
+                raise ValueError(f"{schema.__name__}.{name} is not a column of {table.name}")
+        columns += [table.c[name] for name in ("created_at", "id") if name not in schema.model_fields]
+        return select(*columns).where(*criteria)
+
+    def get_multi_rows(
+        self,
+        db: Session,
+        *,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        criteria: Sequence[Any] = (),
+    ) -> List[Row]:
+        """``get_multi`` as read-only rows shaped like ``schema`` (see select_rows)."""
+        stmt = self._paginate(self.select_rows(schema, *criteria), skip=skip, limit=limit, after=after)
+        return list(db.execute(stmt).all())
+
+    def version(self, db: Session, *criteria: Any) -> Version:
+        """Row count and max(updated_at) of the rows matching ``criteria`` (for ETags)."""
+        count, updated_at = db.execute(self._version_stmt(criteria)).one()
+        return int(count or 0), updated_at
+
+    def _version_stmt(self, criteria: Any) -> Any:
+        if criteria or not self.counter_name:
+            return select(func.count(), func.max(self.model.updated_at)).select_from(self.model).where(*criteria)
+        # Whole table: the row count from stat_counters and max(updated_at) from its
+        # index, so a listing's 304 never scans the table
+        return select(
+            crud_stats.value_stmt(self.counter_name).scalar_subquery(),
+            select(func.max(self.model.updated_at)).scalar_subquery(),
+        )
+
+    def _paginate(
+        self, query: Any, *, skip: int, limit: int, after: Optional[Cursor]
+    ) -> Any:
+        return paginate(
+            query,
+            self.model.created_at,
+            self.model.id,
+            after=after,
+            skip=skip,
+            limit=limit,
+            descending=self.newest_first,
+        )
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        if self.counter_name:
+            crud_stats.increment(db, self.counter_name)
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -58,5 +137,73 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
+        if self.counter_name:
+            crud_stats.increment(db, self.counter_name, -1)
         db.commit()
-        return obj 
\ No newline at end of file
+        return obj
+
+    # Async counterparts of the methods above, used when USE_ASYNC_DB is enabled
+
+    async def aget(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def aversion(self, db: AsyncSession, *criteria: Any) -> Version:
+        count, updated_at = (await db.execute(self._version_stmt(criteria))).one()
+        return int(count or 0), updated_at
+
+    async def aget_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, after: Optional[Cursor] = None
+    ) -> List[ModelType]:
+        stmt = self._paginate(select(self.model), skip=skip, limit=limit, after=after)
+        return list((await db.scalars(stmt)).all())
+
+    async def aget_multi_rows(
+        self,
+        db: AsyncSession,
+        *,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        criteria: Sequence[Any] = (),
+    ) -> List[Row]:
+        stmt = self._paginate(self.select_rows(schema, *criteria), skip=skip, limit=limit, after=after)
+        return list((await db.execute(stmt)).all())
+
+    async def acreate(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)
+        db.add(db_obj)
+        if self.counter_name:
+            await crud_stats.aincrement(db, self.counter_name)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def aupdate(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def aremove(self, db: AsyncSession, *, id: int) -> ModelType:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        if self.counter_name:
+            await crud_stats.aincrement(db, self.counter_name, -1)
+        await db.commit()
+        return obj
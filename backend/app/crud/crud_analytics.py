@@ -0,0 +1,204 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import Date, DateTime, case, delete, desc, func, insert, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.crud_stats import _upsert
+from app.models.inventory import MovementType, StockMovement
+from app.models.stats import MovementRollup
+from app.models.warehouse import StorageLocation
+
+# Location recorded for movements that name none (see MovementRollup)
+NO_LOCATION = 0
+
+RollupKey = Tuple[date, int, int, MovementType]
+
+def location_of(movement_type: MovementType, from_location_id: Optional[int], to_location_id: Optional[int]) -> int:
+    location_id = from_location_id if movement_type == MovementType.OUTBOUND else to_location_id
+    return location_id if location_id is not None else NO_LOCATION
+
+def _location_column():
+    """SQL equivalent of location_of() over stock_movements."""
+    return case(
+        (StockMovement.movement_type == MovementType.OUTBOUND, StockMovement.from_location_id),
+        else_=StockMovement.to_location_id,
+    )
+
+def _record_stmt(db: Union[Session, AsyncSession], movements: Iterable[StockMovement]):
+    now = datetime.utcnow()
+    totals: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+    for movement in movements:
+        key = (
+            (movement.created_at or now).date(),
+            movement.item_id,
+            location_of(movement.movement_type, movement.from_location_id, movement.to_location_id),
+            movement.movement_type,
+        )
+        totals[key][0] += movement.quantity
+        totals[key][1] += 1
+    if not totals:
+        return None
+    table = MovementRollup.__table__
+    # One row per key (PostgreSQL rejects a key twice in one upsert), in key
+    # order so concurrent batches lock the rows in the same order
+    stmt = _upsert(db)(table).values([
+        {
+            "day": day, "item_id": item_id, "location_id": location_id, "movement_type": movement_type,
+            "quantity": quantity, "movements": count, "updated_at": now,
+        }
+        for (day, item_id, location_id, movement_type), (quantity, count)
+        in sorted(totals.items(), key=lambda entry: (entry[0][:3], entry[0][3].value))
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.item_id, table.c.location_id, table.c.movement_type],
+        set_={
+            "quantity": table.c.quantity + stmt.excluded.quantity,
+            "movements": table.c.movements + stmt.excluded.movements,
+            "updated_at": now,
+        },
+    )
+
+def record_movements(db: Session, movements: Iterable[StockMovement]) -> None:
+    """Add ``movements`` to the daily rollups inside the caller's transaction (no commit)."""
+    stmt = _record_stmt(db, movements)
+    if stmt is not None:
+        db.execute(stmt)
+
+async def arecord_movements(db: AsyncSession, movements: Iterable[StockMovement]) -> None:
+    stmt = _record_stmt(db, movements)
+    if stmt is not None:
+        await db.execute(stmt)
+
+def first_movement_day(db: Session) -> Optional[date]:
+    oldest = db.execute(select(func.min(StockMovement.created_at))).scalar()
+    return oldest.date() if oldest else None
+
+def backfill(db: Session, day: date) -> int:
+    """
+    Rebuild one day's rollups from stock_movements and commit. Returns the
+    number of rollup rows written.
+
+    On PostgreSQL the rollup table is locked first, so movements committed
+    while the day is recomputed are neither lost nor counted twice.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE movement_daily_rollups IN EXCLUSIVE MODE"))
+    start = datetime.combine(day, time.min)
+    raw = (
+        select(
+            StockMovement.item_id,
+            func.coalesce(_location_column(), NO_LOCATION).label("location_id"),
+            StockMovement.movement_type,
+            StockMovement.quantity,
+        )
+        .where(StockMovement.created_at >= start, StockMovement.created_at < start + timedelta(days=1))
+        .subquery()
+    )
+    grouped = select(
+        literal(day, Date),
+        raw.c.item_id,
+        raw.c.location_id,
+        raw.c.movement_type,
+        func.sum(raw.c.quantity),
+        func.count(),
+        literal(datetime.utcnow(), DateTime),
+    ).group_by(raw.c.item_id, raw.c.location_id, raw.c.movement_type)
+
+    db.execute(delete(MovementRollup).where(MovementRollup.day == day))
+    written = db.execute(
+        insert(MovementRollup).from_select(
+            ["day", "item_id", "location_id", "movement_type", "quantity", "movements", "updated_at"],
+            grouped,
+        )
+    ).rowcount
+    db.commit()
+    return written
+
+def _filtered(
+    stmt,
+    *,
+    start: date,
+    end: date,
+    movement_type: Optional[MovementType],
+    item_id: Optional[int],
+    location_id: Optional[int],
+    warehouse_id: Optional[int],
+    join_locations: bool = False,
+):
+    stmt = stmt.where(MovementRollup.day >= start, MovementRollup.day <= end)
+    if movement_type is not None:
+        stmt = stmt.where(MovementRollup.movement_type == movement_type)
+    if item_id is not None:
+        stmt = stmt.where(MovementRollup.item_id == item_id)
+    if location_id is not None:
+        stmt = stmt.where(MovementRollup.location_id == location_id)
+    if warehouse_id is not None or join_locations:
+        stmt = stmt.join(StorageLocation, StorageLocation.id == MovementRollup.location_id)
+    if warehouse_id is not None:
+        stmt = stmt.where(StorageLocation.warehouse_id == warehouse_id)
+    return stmt
+
+def daily_throughput(
+    db: Session,
+    *,
+    start: date,
+    end: date,
+    movement_type: Optional[MovementType] = None,
+    item_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    per_warehouse: bool = False,
+) -> List[Dict]:
+    """
+    Units and movements per day and movement type between ``start`` and
+    ``end`` (inclusive), optionally split by warehouse. Days without
+    movements are omitted.
+    """
+    quantity = func.sum(MovementRollup.quantity)
+    movements = func.sum(MovementRollup.movements)
+    group_by = [MovementRollup.day, MovementRollup.movement_type]
+    if per_warehouse:
+        group_by.append(StorageLocation.warehouse_id)
+    stmt = _filtered(
+        select(*group_by, quantity, movements),
+        start=start, end=end, movement_type=movement_type, item_id=item_id,
+        location_id=location_id, warehouse_id=warehouse_id, join_locations=per_warehouse,
+    ).group_by(*group_by).order_by(*group_by)
+    return [
+        {
+            "day": row[0],
+            "movement_type": row[1],
+            "warehouse_id": row[2] if per_warehouse else None,
+            "quantity": int(row[-2]),
+            "movements": int(row[-1]),
+        }
+        for row in db.execute(stmt)
+    ]
+
+def top_items(
+    db: Session,
+    *,
+    start: date,
+    end: date,
+    movement_type: Optional[MovementType] = None,
+    location_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    order_by: str = "movements",
+    limit: int = 20,
+) -> List[Dict]:
+    """The ``limit`` items with the most movements (or units) between ``start`` and ``end``."""
+    quantity = func.sum(MovementRollup.quantity).label("quantity")
+    movements = func.sum(MovementRollup.movements).label("movements")
+    ranking = movements if order_by == "movements" else quantity
+    stmt = _filtered(
+        select(MovementRollup.item_id, quantity, movements),
+        start=start, end=end, movement_type=movement_type, item_id=None,
+        location_id=location_id, warehouse_id=warehouse_id,
+    ).group_by(MovementRollup.item_id).order_by(desc(ranking), MovementRollup.item_id).limit(limit)
+    return [
+        {"item_id": item_id, "quantity": int(quantity), "movements": int(movements)}
+        for item_id, quantity, movements in db.execute(stmt)
+    ]
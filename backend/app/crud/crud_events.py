@@ -0,0 +1,123 @@
+"""
+Push events for stock changes (see app.core.push).
+
+The after_flush listener below turns new movements, item quantity or
+location changes and storage location writes into events, published once
+the session commits. adjust_quantity changes quantities with a Core UPDATE
+the ORM never sees, so it reports them with ``item_changed``; they are
+picked up by the next flush, which is the insert of their movement.
+
+Every event names the warehouses it concerns, so streams can be filtered by
+warehouse. Location -> warehouse lookups are cached per process.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache, invalidate_on_commit
+from app.core.push import Event, publish_on_commit
+from app.core.responses import dump_rows
+from app.models.inventory import InventoryItem, StockMovement
+from app.models.warehouse import StorageLocation
+from app.schemas.inventory import StockMovement as StockMovementOut
+from app.schemas.warehouse import StorageLocation as StorageLocationOut
+
+ITEM_QUANTITY = "item_quantity"
+MOVEMENT_CREATED = "movement_created"
+LOCATION_CREATED = "location_created"
+LOCATION_UPDATED = "location_updated"
+LOCATION_DELETED = "location_deleted"
+
+# storage location id -> warehouse id
+location_warehouses = TTLCache("location_warehouses", maxsize=100000, ttl=3600.0)
+
+_PENDING_ITEMS = "pending_item_events"
+
+def item_changed(db: Any, *, item_id: int, quantity: int, storage_location_id: Optional[int]) -> None:
+    """Report a quantity change made outside the ORM (no query)."""
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault(_PENDING_ITEMS, {})[item_id] = (quantity, storage_location_id)
+
+def _warehouses(session: Session, location_ids: Iterable[Optional[int]]) -> Dict[int, int]:
+    found, missing = {}, []
+    for location_id in set(location_ids):
+        if location_id is None:
+            continue
+        warehouse_id = location_warehouses.get(location_id)
+        if warehouse_id is None:
+            missing.append(location_id)
+        else:
+            found[location_id] = warehouse_id
+    if missing:
+        rows = session.connection().execute(
+            select(StorageLocation.id, StorageLocation.warehouse_id).where(StorageLocation.id.in_(sorted(missing)))
+        )
+        for location_id, warehouse_id in rows:
+            location_warehouses.set(location_id, warehouse_id)
+            found[location_id] = warehouse_id
+    return found
+
+def _warehouse_ids(warehouses: Dict[int, int], *location_ids: Optional[int]) -> List[int]:
+    return sorted({warehouses[location_id] for location_id in location_ids if location_id in warehouses})
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_events(session: Session, flush_context: Any) -> None:
+    items: Dict[int, Tuple[int, Optional[int]]] = session.info.pop(_PENDING_ITEMS, {})
+    movements: List[StockMovement] = []
+    locations: List[Tuple[str, StorageLocation]] = []
+    for obj in session.new:
+        if isinstance(obj, StockMovement):
+            movements.append(obj)
+        elif isinstance(obj, InventoryItem):
+            items[obj.id] = (obj.quantity, obj.storage_location_id)
+        elif isinstance(obj, StorageLocation):
+            locations.append((LOCATION_CREATED, obj))
+    for obj in session.dirty:
+        if isinstance(obj, InventoryItem):
+            state = inspect(obj)
+            if state.attrs.quantity.history.has_changes() or state.attrs.storage_location_id.history.has_changes():
+                items[obj.id] = (obj.quantity, obj.storage_location_id)
+        elif isinstance(obj, StorageLocation) and session.is_modified(obj):
+            invalidate_on_commit(session, location_warehouses, obj.id)
+            locations.append((LOCATION_UPDATED, obj))
+    for obj in session.deleted:
+        if isinstance(obj, StorageLocation):
+            invalidate_on_commit(session, location_warehouses, obj.id)
+            locations.append((LOCATION_DELETED, obj))
+    if not (items or movements or locations):
+        return
+
+    warehouses = _warehouses(session, [
+        *(location_id for _, location_id in items.values()),
+        *(movement.from_location_id for movement in movements),
+        *(movement.to_location_id for movement in movements),
+    ])
+    item_locations = {item_id: location_id for item_id, (_, location_id) in items.items()}
+    events: List[Event] = []
+    for movement, data in zip(movements, dump_rows(StockMovementOut, movements)):
+        events.append({
+            "type": MOVEMENT_CREATED,
+            "warehouse_ids": _warehouse_ids(
+                warehouses, movement.from_location_id, movement.to_location_id, item_locations.get(movement.item_id)
+            ),
+            "data": data,
+        })
+    for item_id, (quantity, location_id) in items.items():
+        events.append({
+            "type": ITEM_QUANTITY,
+            "warehouse_ids": _warehouse_ids(warehouses, location_id),
+            "data": {"id": item_id, "quantity": quantity, "storage_location_id": location_id},
+        })
+    for event_type, location in locations:
+        data = (
+            {"id": location.id, "warehouse_id": location.warehouse_id}
+            if event_type == LOCATION_DELETED
+            else dump_rows(StorageLocationOut, [location])[0]
+        )
+        events.append({"type": event_type, "warehouse_ids": [location.warehouse_id], "data": data})
+    publish_on_commit(session, events)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_ITEMS, None)
@@ -1,79 +1,610 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+from itertools import islice
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+from pydantic import BaseModel
+from sqlalchemy import Row, insert, or_, select, update
+from sqlalchemy.sql import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, noload, selectinload
 
+from app.core.cache import TTLCache, invalidate_on_commit
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.core.search import ranked_search
+from app.crud import crud_analytics, crud_events, crud_low_stock, crud_stats
 from app.crud.base import CRUDBase
-from app.models.inventory import InventoryItem, StockMovement
+from app.models.inventory import InventoryItem, MovementType, StockMovement
+from app.models.warehouse import StorageLocation
+from app.schemas.inventory import InventoryItem as InventoryItemOut
 from app.schemas.inventory import InventoryItemCreate, InventoryItemUpdate, StockMovementCreate
 
+# Barcode -> InventoryItemOut for scan lookups; every write to an item invalidates its
+# barcode after commit (see invalidate_on_commit)
+barcode_cache = TTLCache(
+    "barcodes", maxsize=settings.BARCODE_CACHE_MAX_SIZE, ttl=settings.BARCODE_CACHE_TTL_SECONDS
+)
+
+# Relationships a movement listing can nest via ?expand=
+MOVEMENT_EXPANSIONS = {
+    "item": StockMovement.item,
+    "from_location": StockMovement.from_location,
+    "to_location": StockMovement.to_location,
+    "user": StockMovement.user,
+}
+
+def _movement_load_options(expand: Collection[str]) -> list:
+    # One batched SELECT ... IN per expanded relationship; the rest stay unloaded
+    # (None) so serializing a page never lazy-loads row by row
+    return [
+        selectinload(relationship) if name in expand else noload(relationship)
+        for name, relationship in MOVEMENT_EXPANSIONS.items()
+    ]
+
+IMPORT_COLUMNS = ("name", "barcode", "location_code")
+IMPORT_CHUNK_SIZE = 5000
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _import_int(row: Dict[str, Any], column: str) -> int:
+    raw = (row.get(column) or "").strip()
+    if not raw:
+        return 0
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid {column}: {raw!r}")
+    if value < 0:
+        raise ValueError(f"{column} must not be negative")
+    return value
+
+def _parse_import_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    values = {column: (row.get(column) or "").strip() for column in IMPORT_COLUMNS}
+    for column in IMPORT_COLUMNS:
+        if not values[column]:
+            raise ValueError(f"Missing {column}")
+    values["quantity"] = _import_int(row, "quantity")
+    values["min_quantity"] = _import_int(row, "min_quantity")
+    values["description"] = (row.get("description") or "").strip() or None
+    return values
+
 class CRUDInventoryItem(CRUDBase[InventoryItem, InventoryItemCreate, InventoryItemUpdate]):
+    counter_name = crud_stats.ITEMS
+
     def get_by_barcode(self, db: Session, *, barcode: str) -> Optional[InventoryItem]:
         return db.query(InventoryItem).filter(InventoryItem.barcode == barcode).first()
 
+    async def aget_by_barcode(self, db: AsyncSession, *, barcode: str) -> Optional[InventoryItem]:
+        return await db.scalar(select(InventoryItem).where(InventoryItem.barcode == barcode))
+
+    def get_cached_by_barcode(self, db: Session, *, barcode: str) -> Optional[InventoryItemOut]:
+        """Scan lookup through barcode_cache; misses are not cached."""
+        cached = barcode_cache.get(barcode)
+        if cached is None:
+            item = self.get_by_barcode(db, barcode=barcode)
+            if item is None:
+                return None
+            cached = InventoryItemOut.model_validate(item)
+            barcode_cache.set(barcode, cached)
+        return cached
+
+    async def aget_cached_by_barcode(self, db: AsyncSession, *, barcode: str) -> Optional[InventoryItemOut]:
+        cached = barcode_cache.get(barcode)
+        if cached is None:
+            item = await self.aget_by_barcode(db, barcode=barcode)
+            if item is None:
+                return None
+            cached = InventoryItemOut.model_validate(item)
+            barcode_cache.set(barcode, cached)
+        return cached
+
+    def update(
+        self, db: Session, *, db_obj: InventoryItem, obj_in: Union[InventoryItemUpdate, Dict[str, Any]]
+    ) -> InventoryItem:
+        invalidate_on_commit(db, barcode_cache, db_obj.barcode)
+        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+
+    async def aupdate(
+        self, db: AsyncSession, *, db_obj: InventoryItem, obj_in: Union[InventoryItemUpdate, Dict[str, Any]]
+    ) -> InventoryItem:
+        invalidate_on_commit(db, barcode_cache, db_obj.barcode)
+        return await super().aupdate(db, db_obj=db_obj, obj_in=obj_in)
+
+    def remove(self, db: Session, *, id: int) -> InventoryItem:
+        item = self.get(db, id=id)
+        if item is not None:
+            invalidate_on_commit(db, barcode_cache, item.barcode)
+        return super().remove(db, id=id)
+
+    async def aremove(self, db: AsyncSession, *, id: int) -> InventoryItem:
+        item = await self.aget(db, id=id)
+        if item is not None:
+            invalidate_on_commit(db, barcode_cache, item.barcode)
+        return await super().aremove(db, id=id)
+
     def get_multi_by_location(
-        self, db: Session, *, location_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        location_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+    ) -> List[InventoryItem]:
+        query = db.query(InventoryItem).filter(InventoryItem.storage_location_id == location_id)
+        return self._paginate(query, skip=skip, limit=limit, after=after).all()
+
+    def get_multi_rows_by_location(
+        self,
+        db: Session,
+        *,
+        location_id: int,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+    ) -> List[Row]:
+        return self.get_multi_rows(
+            db, schema=schema, skip=skip, limit=limit, after=after,
+            criteria=[InventoryItem.storage_location_id == location_id],
+        )
+
+    def adjust_quantity(
+        self,
+        db: Session,
+        *,
+        item_id: int,
+        delta: int,
+        storage_location_id: Optional[int] = None,
+    ) -> int:
+        """
+        Add ``delta`` to an item's quantity in a single conditional UPDATE.
+
+        Decrements only match while enough stock is left, so concurrent
+        movements can never drive the quantity negative or lose an update.
+        Crossing the item's min_quantity updates the low-stock set, and the
+        change is pushed to event streams on commit. Does not commit. Returns
+        the new quantity.
+        """
+        row = db.execute(
+            self._adjust_stmt(item_id, delta, storage_location_id),
+            execution_options={"synchronize_session": False},
+        ).one_or_none()
+        if row is None:
+            if not db.query(InventoryItem.id).filter(InventoryItem.id == item_id).first():
+                raise ValueError("Item not found")
+            raise ValueError("Insufficient stock")
+        invalidate_on_commit(db, barcode_cache, row.barcode)
+        crud_events.item_changed(
+            db, item_id=item_id, quantity=row.quantity, storage_location_id=row.storage_location_id
+        )
+        crud_low_stock.record_crossing(
+            db, item_id=item_id, before=row.quantity - delta, after=row.quantity, min_quantity=row.min_quantity
+        )
+        return row.quantity
+
+    async def aadjust_quantity(
+        self,
+        db: AsyncSession,
+        *,
+        item_id: int,
+        delta: int,
+        storage_location_id: Optional[int] = None,
+    ) -> int:
+        row = (
+            await db.execute(
+                self._adjust_stmt(item_id, delta, storage_location_id),
+                execution_options={"synchronize_session": False},
+            )
+        ).one_or_none()
+        if row is None:
+            if not await db.scalar(select(InventoryItem.id).where(InventoryItem.id == item_id)):
+                raise ValueError("Item not found")
+            raise ValueError("Insufficient stock")
+        invalidate_on_commit(db, barcode_cache, row.barcode)
+        crud_events.item_changed(
+            db, item_id=item_id, quantity=row.quantity, storage_location_id=row.storage_location_id
+        )
+        await crud_low_stock.arecord_crossing(
+            db, item_id=item_id, before=row.quantity - delta, after=row.quantity, min_quantity=row.min_quantity
+        )
+        return row.quantity
+
+    @staticmethod
+    def _adjust_stmt(item_id: int, delta: int, storage_location_id: Optional[int]):
+        stmt = update(InventoryItem).where(InventoryItem.id == item_id)
+        if delta < 0:
+            stmt = stmt.where(InventoryItem.quantity >= -delta)
+        values = {"quantity": InventoryItem.quantity + delta}
+        if storage_location_id is not None:
+            values["storage_location_id"] = storage_location_id
+        return stmt.values(**values).returning(
+            InventoryItem.quantity,
+            InventoryItem.barcode,
+            InventoryItem.min_quantity,
+            InventoryItem.storage_location_id,
+        )
+
+    def search(
+        self, db: Session, *, term: str, skip: int = 0, limit: int = 100
     ) -> List[InventoryItem]:
-        return (
-            db.query(InventoryItem)
-            .filter(InventoryItem.storage_location_id == location_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        """Ranked search over item name and barcode (see app.core.search)."""
+        query = ranked_search(
+            db.query(InventoryItem),
+            term,
+            name_col=InventoryItem.name,
+            barcode_col=InventoryItem.barcode,
+            id_col=InventoryItem.id,
         )
+        return query.offset(skip).limit(limit).all()
 
     def search_by_name(
         self, db: Session, *, name: str, skip: int = 0, limit: int = 100
     ) -> List[InventoryItem]:
-        return (
-            db.query(InventoryItem)
-            .filter(InventoryItem.name.ilike(f"%{name}%"))
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        return self.search(db, term=name, skip=skip, limit=limit)
+
+    def bulk_import(
+        self,
+        db: Session,
+        *,
+        rows: Iterable[Dict[str, Any]],
+        warehouse_id: Optional[int] = None,
+        dry_run: bool = False,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+    ) -> Dict[str, Any]:
+        """
+        Create items from CSV rows (name, barcode, location_code and optional
+        quantity, min_quantity, description) in one transaction.
+
+        Each chunk costs one query for barcodes already in the database, one
+        for location codes not seen yet and one multi-row INSERT. Invalid rows
+        are skipped and reported by row number (1-based, header excluded).
+        """
+        seen_barcodes = set()
+        # location code -> id, or the reason it can't be used
+        locations: Dict[str, Union[int, str]] = {}
+        errors: List[Dict[str, Any]] = []
+        total = created = 0
+
+        for chunk in _chunks(enumerate(rows, start=1), chunk_size):
+            total += len(chunk)
+            parsed = []
+            for row_number, row in chunk:
+                try:
+                    values = _parse_import_row(row)
+                except ValueError as e:
+                    errors.append({"row": row_number, "barcode": row.get("barcode") or None, "error": str(e)})
+                    continue
+                if values["barcode"] in seen_barcodes:
+                    errors.append({"row": row_number, "barcode": values["barcode"], "error": "Duplicate barcode in file"})
+                    continue
+                seen_barcodes.add(values["barcode"])
+                parsed.append((row_number, values))
+            if not parsed:
+                continue
+
+            existing = set(db.scalars(
+                select(InventoryItem.barcode).where(
+                    InventoryItem.barcode.in_([values["barcode"] for _, values in parsed])
+                )
+            ))
+            new_codes = {values["location_code"] for _, values in parsed} - locations.keys()
+            if new_codes:
+                locations.update(self._resolve_location_codes(db, new_codes, warehouse_id))
+
+            to_insert = []
+            for row_number, values in parsed:
+                location = locations[values["location_code"]]
+                if values["barcode"] in existing:
+                    error = "Barcode already exists"
+                elif isinstance(location, str):
+                    error = location
+                else:
+                    to_insert.append({
+                        "name": values["name"],
+                        "barcode": values["barcode"],
+                        "storage_location_id": location,
+                        "quantity": values["quantity"],
+                        "min_quantity": values["min_quantity"],
+                        "description": values["description"],
+                    })
+                    continue
+                errors.append({"row": row_number, "barcode": values["barcode"], "error": error})
+            if to_insert and not dry_run:
+                db.execute(insert(InventoryItem), to_insert)
+                # Core inserts bypass the low-stock after_flush listener
+                below = [
+                    values["barcode"] for values in to_insert
+                    if crud_low_stock.is_below(values["quantity"], values["min_quantity"])
+                ]
+                if below:
+                    item_ids = db.scalars(select(InventoryItem.id).where(InventoryItem.barcode.in_(below))).all()
+                    db.execute(crud_low_stock._mark_stmt(db, item_ids))
+            created += len(to_insert)
+
+        if dry_run:
+            db.rollback()
+        elif created:
+            crud_stats.increment(db, self.counter_name, created)
+            db.commit()
+        return {
+            "total": total,
+            "created": created,
+            "failed": len(errors),
+            "dry_run": dry_run,
+            "errors": errors,
+        }
+
+    def _resolve_location_codes(
+        self, db: Session, codes: Collection[str], warehouse_id: Optional[int]
+    ) -> Dict[str, Union[int, str]]:
+        stmt = select(StorageLocation.code, StorageLocation.id).where(StorageLocation.code.in_(codes))
+        if warehouse_id is not None:
+            stmt = stmt.where(StorageLocation.warehouse_id == warehouse_id)
+        matches: Dict[str, List[int]] = {}
+        for code, location_id in db.execute(stmt):
+            matches.setdefault(code, []).append(location_id)
+        resolved: Dict[str, Union[int, str]] = {}
+        for code in codes:
+            ids = matches.get(code, [])
+            if len(ids) == 1:
+                resolved[code] = ids[0]
+            elif ids:
+                resolved[code] = "Location code exists in several warehouses; pass warehouse_id"
+            else:
+                resolved[code] = f"Unknown location code: {code}"
+        return resolved
 
 class CRUDStockMovement(CRUDBase[StockMovement, StockMovementCreate, StockMovementCreate]):
+    newest_first = True
+
+    def export_query(
+        self,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        item_id: Optional[int] = None,
+        location_id: Optional[int] = None,
+        movement_type: Optional[MovementType] = None,
+    ) -> Select:
+        """Flat movement rows, oldest first, for streaming exports (``end`` is exclusive)."""
+        stmt = select(
+            StockMovement.id,
+            StockMovement.created_at,
+            StockMovement.item_id,
+            StockMovement.movement_type,
+            StockMovement.quantity,
+            StockMovement.from_location_id,
+            StockMovement.to_location_id,
+            StockMovement.user_id,
+            StockMovement.notes,
+        ).order_by(StockMovement.created_at, StockMovement.id)
+        if start is not None:
+            stmt = stmt.where(StockMovement.created_at >= start)
+        if end is not None:
+            stmt = stmt.where(StockMovement.created_at < end)
+        if item_id is not None:
+            stmt = stmt.where(StockMovement.item_id == item_id)
+        if location_id is not None:
+            stmt = stmt.where(or_(
+                StockMovement.from_location_id == location_id,
+                StockMovement.to_location_id == location_id,
+            ))
+        if movement_type is not None:
+            stmt = stmt.where(StockMovement.movement_type == movement_type)
+        return stmt
+
     def get_multi_by_item(
-        self, db: Session, *, item_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        item_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        expand: Collection[str] = (),
     ) -> List[StockMovement]:
-        return (
+        query = (
             db.query(StockMovement)
             .filter(StockMovement.item_id == item_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .options(*_movement_load_options(expand))
+        )
+        return self._paginate(query, skip=skip, limit=limit, after=after).all()
+
+    async def aget_multi_by_item(
+        self,
+        db: AsyncSession,
+        *,
+        item_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+        expand: Collection[str] = (),
+    ) -> List[StockMovement]:
+        stmt = (
+            select(StockMovement)
+            .where(StockMovement.item_id == item_id)
+            .options(*_movement_load_options(expand))
+        )
+        stmt = self._paginate(stmt, skip=skip, limit=limit, after=after)
+        return list((await db.scalars(stmt)).all())
+
+    def get_multi_rows_by_item(
+        self,
+        db: Session,
+        *,
+        item_id: int,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+    ) -> List[Row]:
+        return self.get_multi_rows(
+            db, schema=schema, skip=skip, limit=limit, after=after,
+            criteria=[StockMovement.item_id == item_id],
+        )
+
+    async def aget_multi_rows_by_item(
+        self,
+        db: AsyncSession,
+        *,
+        item_id: int,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+    ) -> List[Row]:
+        return await self.aget_multi_rows(
+            db, schema=schema, skip=skip, limit=limit, after=after,
+            criteria=[StockMovement.item_id == item_id],
         )
 
     def create_with_item_update(
         self, db: Session, *, obj_in: StockMovementCreate, user_id: int
     ) -> StockMovement:
+        # Update the item quantity atomically in the database
+        delta, storage_location_id = self._quantity_change(obj_in)
+        try:
+            inventory_item.adjust_quantity(
+                db,
+                item_id=obj_in.item_id,
+                delta=delta,
+                storage_location_id=storage_location_id,
+            )
+        except ValueError:
+            db.rollback()
+            raise
+
         # Create the movement record
         db_obj = StockMovement(
             **obj_in.dict(),
             user_id=user_id
         )
         db.add(db_obj)
-        
-        # Update the item quantity
-        item = db.query(InventoryItem).filter(InventoryItem.id == obj_in.item_id).first()
-        if not item:
-            raise ValueError("Item not found")
-            
-        if obj_in.movement_type == "inbound":
-            item.quantity += obj_in.quantity
-        elif obj_in.movement_type == "outbound":
-            if item.quantity < obj_in.quantity:
-                raise ValueError("Insufficient stock")
-            item.quantity -= obj_in.quantity
-        elif obj_in.movement_type == "transfer":
-            if item.quantity < obj_in.quantity:
-                raise ValueError("Insufficient stock")
-            item.quantity -= obj_in.quantity
-            item.storage_location_id = obj_in.to_location_id
-            
-        db.add(item)
+        crud_stats.record_movements(db)
+        crud_analytics.record_movements(db, [db_obj])
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    async def acreate_with_item_update(
+        self, db: AsyncSession, *, obj_in: StockMovementCreate, user_id: int
+    ) -> StockMovement:
+        delta, storage_location_id = self._quantity_change(obj_in)
+        try:
+            await inventory_item.aadjust_quantity(
+                db,
+                item_id=obj_in.item_id,
+                delta=delta,
+                storage_location_id=storage_location_id,
+            )
+        except ValueError:
+            await db.rollback()
+            raise
+
+        db_obj = StockMovement(
+            **obj_in.dict(),
+            user_id=user_id
+        )
+        db.add(db_obj)
+        await crud_stats.arecord_movements(db)
+        await crud_analytics.arecord_movements(db, [db_obj])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    def create_batch(
+        self, db: Session, *, objs_in: List[StockMovementCreate], user_id: int
+    ) -> List[Tuple[Optional[StockMovement], Optional[str]]]:
+        """
+        Apply many movements in a single transaction.
+
+        Items and locations are validated with one query each, quantity
+        changes are applied in order (so later rows see the effect of earlier
+        ones) and the valid movements are inserted together. Returns one
+        ``(movement, error)`` pair per input row; invalid rows are skipped
+        without aborting the rest of the batch.
+        """
+        return self.create_many(db, entries=[(obj_in, user_id) for obj_in in objs_in])
+
+    def create_many(
+        self, db: Session, *, entries: List[Tuple[StockMovementCreate, int]]
+    ) -> List[Tuple[Optional[StockMovement], Optional[str]]]:
+        """
+        create_batch for movements from different users, as ``(obj_in,
+        user_id)`` pairs. Each touched item is written once, with the net
+        of its movements, at the flush.
+        """
+        item_ids = {obj_in.item_id for obj_in, _ in entries}
+        location_ids = {
+            location_id
+            for obj_in, _ in entries
+            for location_id in (obj_in.from_location_id, obj_in.to_location_id)
+            if location_id is not None
+        }
+        # Lock the rows (in id order, to avoid deadlocks) for the whole batch
+        items = {
+            item.id: item
+            for item in db.query(InventoryItem)
+            .filter(InventoryItem.id.in_(item_ids))
+            .order_by(InventoryItem.id)
+            .with_for_update()
+        }
+        known_locations = set()
+        if location_ids:
+            known_locations = {
+                location_id
+                for (location_id,) in db.query(StorageLocation.id).filter(
+                    StorageLocation.id.in_(location_ids)
+                )
+            }
+
+        results: List[Tuple[Optional[StockMovement], Optional[str]]] = []
+        for obj_in, user_id in entries:
+            item = items.get(obj_in.item_id)
+            try:
+                if not item:
+                    raise ValueError("Item not found")
+                for location_id in (obj_in.from_location_id, obj_in.to_location_id):
+                    if location_id is not None and location_id not in known_locations:
+                        raise ValueError(f"Storage location {location_id} not found")
+                self._apply_to_item(item, obj_in)
+            except ValueError as e:
+                results.append((None, str(e)))
+                continue
+            results.append((StockMovement(**obj_in.dict(), user_id=user_id), None))
+
+        movements = [movement for movement, _ in results if movement is not None]
+        invalidate_on_commit(db, barcode_cache, *{items[movement.item_id].barcode for movement in movements})
+        db.add_all(movements)
+        crud_stats.record_movements(db, len(movements))
+        crud_analytics.record_movements(db, movements)
+        db.flush()
+        movement_ids = [movement.id for movement in movements]
+        db.commit()
+        if movement_ids:
+            # Reload every new row with one SELECT instead of a refresh per row.
+            db.query(StockMovement).filter(StockMovement.id.in_(movement_ids)).all()
+        return results
+
+    @staticmethod
+    def _quantity_change(obj_in: StockMovementCreate) -> Tuple[int, Optional[int]]:
+        """Return the quantity delta and new storage location implied by a movement."""
+        if obj_in.movement_type == MovementType.INBOUND:
+            return obj_in.quantity, None
+        if obj_in.movement_type == MovementType.TRANSFER:
+            return -obj_in.quantity, obj_in.to_location_id
+        return -obj_in.quantity, None
+
+    def _apply_to_item(self, item: InventoryItem, obj_in: StockMovementCreate) -> None:
+        delta, storage_location_id = self._quantity_change(obj_in)
+        if item.quantity + delta < 0:
+            raise ValueError("Insufficient stock")
+        item.quantity += delta
+        if storage_location_id is not None:
+            item.storage_location_id = storage_location_id
+
 inventory_item = CRUDInventoryItem(InventoryItem)
 stock_movement = CRUDStockMovement(StockMovement) 
\ No newline at end of file
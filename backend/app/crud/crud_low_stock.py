@@ -0,0 +1,134 @@
+"""
+Low-stock tracking: the set of items below their min_quantity.
+
+Every write that changes an item's quantity or minimum checks whether the
+item crossed its threshold and, only then, adds it to or removes it from
+``low_stock_items``. Movements go through adjust_quantity's conditional
+UPDATE and call ``record_crossing`` with the before/after quantities; ORM
+writes (item create/update/delete, batch movements) are caught by the
+after_flush listener below, and CSV imports mark their new items directly.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import delete, event, func, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.crud.crud_stats import _upsert
+from app.models.inventory import InventoryItem, LowStockItem
+from app.models.warehouse import StorageLocation
+
+def is_below(quantity: Optional[int], min_quantity: Optional[int]) -> bool:
+    return (quantity or 0) < (min_quantity or 0)
+
+def _mark_stmt(db: Union[Session, AsyncSession], item_ids: Iterable[int]):
+    now = datetime.utcnow()
+    table = LowStockItem.__table__
+    stmt = _upsert(db)(table).values([{"item_id": item_id, "below_since": now} for item_id in sorted(item_ids)])
+    return stmt.on_conflict_do_nothing(index_elements=[table.c.item_id])
+
+def _unmark_stmt(item_ids: Iterable[int]):
+    return delete(LowStockItem).where(LowStockItem.item_id.in_(sorted(item_ids)))
+
+def _crossing_stmt(db: Union[Session, AsyncSession], item_id: int, before: int, after: int, min_quantity: Optional[int]):
+    was_below, now_below = is_below(before, min_quantity), is_below(after, min_quantity)
+    if was_below == now_below:
+        return None
+    return _mark_stmt(db, [item_id]) if now_below else _unmark_stmt([item_id])
+
+def record_crossing(db: Session, *, item_id: int, before: int, after: int, min_quantity: Optional[int]) -> None:
+    """Update the set if a quantity change from ``before`` to ``after`` crossed the minimum (no commit)."""
+    stmt = _crossing_stmt(db, item_id, before, after, min_quantity)
+    if stmt is not None:
+        db.execute(stmt)
+
+async def arecord_crossing(
+    db: AsyncSession, *, item_id: int, before: int, after: int, min_quantity: Optional[int]
+) -> None:
+    stmt = _crossing_stmt(db, item_id, before, after, min_quantity)
+    if stmt is not None:
+        await db.execute(stmt)
+
+def _previous(state: Any, attribute: str) -> Any:
+    history = state.attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else history.added[0] if history.added else None
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_items(session: Session, flush_context: Any) -> None:
+    marked, unmarked = set(), set()
+    for obj in session.new:
+        if isinstance(obj, InventoryItem) and is_below(obj.quantity, obj.min_quantity):
+            marked.add(obj.id)
+    for obj in session.dirty:
+        if not isinstance(obj, InventoryItem):
+            continue
+        state = inspect(obj)
+        if not (state.attrs.quantity.history.has_changes() or state.attrs.min_quantity.history.has_changes()):
+            continue
+        was_below = is_below(_previous(state, "quantity"), _previous(state, "min_quantity"))
+        now_below = is_below(obj.quantity, obj.min_quantity)
+        if now_below and not was_below:
+            marked.add(obj.id)
+        elif was_below and not now_below:
+            unmarked.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, InventoryItem):
+            # ON DELETE CASCADE covers PostgreSQL; SQLite doesn't enforce foreign keys
+            unmarked.add(obj.id)
+    connection = session.connection()
+    if marked:
+        connection.execute(_mark_stmt(session, marked))
+    if unmarked:
+        connection.execute(_unmark_stmt(unmarked))
+
+def get_multi(
+    db: Session,
+    *,
+    warehouse_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[Any]:
+    """
+    Items below minimum, longest first, as rows with the InventoryItem
+    columns plus ``warehouse_id`` and ``below_since``.
+
+    Starts from low_stock_items and joins each entry's item and location by
+    primary key, so the cost follows the size of the set, not the catalog.
+    """
+    item_columns = [column for column in InventoryItem.__table__.c]
+    stmt = (
+        select(*item_columns, StorageLocation.warehouse_id, LowStockItem.below_since)
+        .select_from(LowStockItem)
+        .join(InventoryItem, InventoryItem.id == LowStockItem.item_id)
+        .join(StorageLocation, StorageLocation.id == InventoryItem.storage_location_id)
+    )
+    if warehouse_id is not None:
+        stmt = stmt.where(StorageLocation.warehouse_id == warehouse_id)
+    if location_id is not None:
+        stmt = stmt.where(InventoryItem.storage_location_id == location_id)
+    stmt = stmt.order_by(LowStockItem.below_since, LowStockItem.item_id).offset(skip).limit(limit)
+    return list(db.execute(stmt).all())
+
+def rebuild(db: Session) -> Dict[str, int]:
+    """
+    Recompute the set from inventory_items to correct drift, keeping the
+    below_since of entries that are still below minimum. Commits.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE low_stock_items IN EXCLUSIVE MODE"))
+    below = select(InventoryItem.id).where(
+        func.coalesce(InventoryItem.quantity, 0) < func.coalesce(InventoryItem.min_quantity, 0)
+    )
+    removed = db.execute(
+        delete(LowStockItem).where(LowStockItem.item_id.not_in(below)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    missing = list(db.scalars(below.where(InventoryItem.id.not_in(select(LowStockItem.item_id)))))
+    if missing:
+        db.execute(_mark_stmt(db, missing))
+    db.commit()
+    return {"added": len(missing), "removed": removed}
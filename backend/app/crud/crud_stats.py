@@ -0,0 +1,120 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Union
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.inventory import InventoryItem, StockMovement
+from app.models.stats import StatCounter
+from app.models.warehouse import StorageLocation, Warehouse
+
+WAREHOUSES = "warehouses"
+ITEMS = "items"
+LOCATIONS = "locations"
+# Prefix of the per-day movement buckets; nothing reads an all-time total, so none is kept
+MOVEMENTS = "movements"
+
+def movements_on(day: date) -> str:
+    return f"{MOVEMENTS}:{day.isoformat()}"
+
+def _recent_days(today: date) -> List[str]:
+    return [movements_on(today - timedelta(days=n)) for n in range(settings.RECENT_MOVEMENT_DAYS)]
+
+def _upsert(db: Union[Session, AsyncSession]):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # app.db.session refuses other dialects at startup
+        raise RuntimeError(f"INSERT ... ON CONFLICT is not supported on {dialect}")
+    return insert
+
+def _increment_stmt(db: Union[Session, AsyncSession], name: str, delta: int, sharded: bool):
+    shard = random.randrange(settings.STAT_COUNTER_SHARDS) if sharded else 0
+    now = datetime.utcnow()
+    table = StatCounter.__table__
+    stmt = _upsert(db)(table).values(name=name, shard=shard, value=delta, updated_at=now)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.name, table.c.shard],
+        set_={"value": table.c.value + delta, "updated_at": now},
+    )
+
+def increment(db: Session, name: str, delta: int = 1, *, sharded: bool = False) -> None:
+    """
+    Add ``delta`` to a counter inside the caller's transaction (no commit).
+
+    ``sharded`` spreads the write over STAT_COUNTER_SHARDS rows; use it for
+    counters bumped by every movement so writers don't serialise on one row.
+    """
+    if delta:
+        db.execute(_increment_stmt(db, name, delta, sharded))
+
+async def aincrement(db: AsyncSession, name: str, delta: int = 1, *, sharded: bool = False) -> None:
+    if delta:
+        await db.execute(_increment_stmt(db, name, delta, sharded))
+
+def record_movements(db: Session, count: int = 1) -> None:
+    increment(db, movements_on(datetime.utcnow().date()), count, sharded=True)
+
+async def arecord_movements(db: AsyncSession, count: int = 1) -> None:
+    await aincrement(db, movements_on(datetime.utcnow().date()), count, sharded=True)
+
+def value_stmt(name: str):
+    """Select one counter's value: the sum of its shards."""
+    return select(func.coalesce(func.sum(StatCounter.value), 0)).where(StatCounter.name == name)
+
+def get_dashboard_stats(db: Session) -> Dict[str, int]:
+    """Read the dashboard numbers with one bounded primary-key lookup."""
+    days = _recent_days(datetime.utcnow().date())
+    rows = (
+        db.query(StatCounter.name, func.sum(StatCounter.value))
+        .filter(StatCounter.name.in_([WAREHOUSES, ITEMS, LOCATIONS, *days]))
+        .group_by(StatCounter.name)
+        .all()
+    )
+    values = {name: int(value or 0) for name, value in rows}
+    return {
+        "totalWarehouses": values.get(WAREHOUSES, 0),
+        "totalItems": values.get(ITEMS, 0),
+        "totalLocations": values.get(LOCATIONS, 0),
+        "recentMovements": sum(values.get(day, 0) for day in days),
+    }
+
+def reconcile(db: Session) -> Dict[str, int]:
+    """
+    Recount every counter from the source tables and replace the stored values.
+
+    On PostgreSQL the counters table is locked first, so writers that commit
+    while the recount runs are neither lost nor counted twice. Day buckets
+    older than the recent-movements window are dropped.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stat_counters IN EXCLUSIVE MODE"))
+    today = datetime.utcnow().date()
+    oldest = today - timedelta(days=settings.RECENT_MOVEMENT_DAYS - 1)
+    counts = {
+        WAREHOUSES: db.query(func.count(Warehouse.id)).scalar(),
+        ITEMS: db.query(func.count(InventoryItem.id)).scalar(),
+        LOCATIONS: db.query(func.count(StorageLocation.id)).scalar(),
+    }
+    day_col = func.date(StockMovement.created_at)
+    for day, count in (
+        db.query(day_col, func.count(StockMovement.id))
+        .filter(StockMovement.created_at >= datetime.combine(oldest, datetime.min.time()))
+        .group_by(day_col)
+    ):
+        counts[f"{MOVEMENTS}:{day}"] = count
+
+    now = datetime.utcnow()
+    db.query(StatCounter).delete(synchronize_session=False)
+    db.bulk_insert_mappings(
+        StatCounter,
+        [{"name": name, "shard": 0, "value": value, "updated_at": now} for name, value in counts.items()],
+    )
+    db.commit()
+    return counts
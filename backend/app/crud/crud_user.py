@@ -1,21 +1,30 @@
 from typing import Any, Dict, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import TTLCache, invalidate
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
 from app.crud.base import CRUDBase
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import CurrentUser, UserCreate, UserUpdate
+
+# Token subject (user id) -> CurrentUser, so auth doesn't query users per request
+user_cache = TTLCache(
+    "users", maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    def create(self, db: Session, *, obj_in: UserCreate, is_superuser: bool = False) -> User:
+        # Not part of UserCreate, so /auth/register can't create superusers
         db_obj = User(
             email=obj_in.email,
             hashed_password=get_password_hash(obj_in.password),
             full_name=obj_in.full_name,
-            is_superuser=obj_in.is_superuser,
+            is_superuser=is_superuser,
         )
         db.add(db_obj)
         db.commit()
@@ -33,14 +42,49 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             hashed_password = get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
-        return super().update(db, db_obj=db_obj, obj_in=update_data)
+        user = super().update(db, db_obj=db_obj, obj_in=update_data)
+        invalidate(user_cache, user.id)
+        return user
+
+    def remove(self, db: Session, *, id: int) -> User:
+        user = super().remove(db, id=id)
+        invalidate(user_cache, id)
+        return user
+
+    def get_current(self, db: Session, *, id: int) -> Optional[CurrentUser]:
+        """Look up a token subject for the auth dependencies, via user_cache."""
+        current = user_cache.get(id)
+        if current is None:
+            db_obj = self.get(db, id=id)
+            if not db_obj:
+                return None
+            current = CurrentUser.model_validate(db_obj)
+            user_cache.set(id, current)
+        return current
+
+    async def aget_current(self, db: AsyncSession, *, id: int) -> Optional[CurrentUser]:
+        current = user_cache.get(id)
+        if current is None:
+            db_obj = await self.aget(db, id=id)
+            if not db_obj:
+                return None
+            current = CurrentUser.model_validate(db_obj)
+            user_cache.set(id, current)
+        return current
 
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not verified:
             return None
+        if new_hash:
+            # BCRYPT_ROUNDS changed since this hash was made; upgrade it transparently
+            user.hashed_password = new_hash
+            db.add(user)
+            db.commit()
+            db.refresh(user)
         return user
 
     def is_active(self, user: User) -> bool:
@@ -1,26 +1,35 @@
-from typing import List, Optional
+from typing import List, Optional, Type
+from pydantic import BaseModel
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
+from app.core.pagination import Cursor
+from app.crud import crud_stats
 from app.crud.base import CRUDBase
 from app.models.warehouse import Warehouse, StorageLocation
 from app.schemas.warehouse import WarehouseCreate, WarehouseUpdate, StorageLocationCreate, StorageLocationUpdate
 
 class CRUDWarehouse(CRUDBase[Warehouse, WarehouseCreate, WarehouseUpdate]):
+    counter_name = crud_stats.WAREHOUSES
+
     def get_by_code(self, db: Session, *, code: str) -> Optional[Warehouse]:
         return db.query(Warehouse).filter(Warehouse.code == code).first()
 
     def get_multi_by_owner(
-        self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
     ) -> List[Warehouse]:
-        return (
-            db.query(Warehouse)
-            .filter(Warehouse.owner_id == owner_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
+        query = db.query(Warehouse).filter(Warehouse.owner_id == owner_id)
+        return self._paginate(query, skip=skip, limit=limit, after=after).all()
 
 class CRUDStorageLocation(CRUDBase[StorageLocation, StorageLocationCreate, StorageLocationUpdate]):
+    counter_name = crud_stats.LOCATIONS
+
     def get_by_code(self, db: Session, *, code: str, warehouse_id: int) -> Optional[StorageLocation]:
         return (
             db.query(StorageLocation)
@@ -29,14 +38,30 @@ class CRUDStorageLocation(CRUDBase[StorageLocation, StorageLocationCreate, Stora
         )
 
     def get_multi_by_warehouse(
-        self, db: Session, *, warehouse_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        warehouse_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
     ) -> List[StorageLocation]:
-        return (
-            db.query(StorageLocation)
-            .filter(StorageLocation.warehouse_id == warehouse_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        query = db.query(StorageLocation).filter(StorageLocation.warehouse_id == warehouse_id)
+        return self._paginate(query, skip=skip, limit=limit, after=after).all()
+
+    def get_multi_rows_by_warehouse(
+        self,
+        db: Session,
+        *,
+        warehouse_id: int,
+        schema: Type[BaseModel],
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+    ) -> List[Row]:
+        return self.get_multi_rows(
+            db, schema=schema, skip=skip, limit=limit, after=after,
+            criteria=[StorageLocation.warehouse_id == warehouse_id],
         )
 
 warehouse = CRUDWarehouse(Warehouse)
@@ -0,0 +1,42 @@
+"""
+Rebuild the daily movement rollups from stock_movements.
+
+Backfill everything after upgrading:   python -m app.db.backfill_rollups
+Rebuild a range of days:               python -m app.db.backfill_rollups --since 2026-01-01 --until 2026-03-31
+
+Each day is recomputed in its own transaction, so the command can run
+against a live database and be interrupted and resumed.
+"""
+import argparse
+import logging
+from datetime import date, datetime, timedelta
+
+from app.crud import crud_analytics
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=date.fromisoformat, help="first day (default: oldest movement)")
+    parser.add_argument("--until", type=date.fromisoformat, help="last day, inclusive (default: today, UTC)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        since = args.since or crud_analytics.first_movement_day(db)
+        until = args.until or datetime.utcnow().date()
+        if since is None:
+            logger.info("No movements to roll up")
+            return
+        day = since
+        while day <= until:
+            rows = crud_analytics.backfill(db, day)
+            logger.info("Rolled up %s: %d rows", day, rows)
+            day += timedelta(days=1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
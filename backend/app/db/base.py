@@ -1,4 +1,6 @@
 from app.models.base import Base
 from app.models.user import User
 from app.models.warehouse import Warehouse, StorageLocation
-from app.models.inventory import InventoryItem, StockMovement 
\ No newline at end of file
+from app.models.inventory import InventoryItem, LowStockItem, StockMovement
+from app.models.stats import MovementRollup, StatCounter
+from app.models.idempotency import IdempotencyKey
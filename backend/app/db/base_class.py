@@ -0,0 +1 @@
+from app.models.base import Base  # noqa: F401
@@ -12,6 +12,5 @@ def init_db(db: Session) -> None:
             email=settings.FIRST_SUPERUSER_EMAIL,
             password=settings.FIRST_SUPERUSER_PASSWORD,
             full_name="Initial Super User",
-            is_superuser=True,
         )
-        user = crud_user.user.create(db, obj_in=user_in) 
\ No newline at end of file
+        user = crud_user.user.create(db, obj_in=user_in, is_superuser=True) 
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Maintain the monthly range partitions of stock_movements (PostgreSQL only).
+
+Create the partitions for the coming months and retire old ones:
+
+    python -m app.db.partitions --ahead 3
+    python -m app.db.partitions --retain-months 24 --archive-dir /var/backups/wms
+
+Run it at least monthly (e.g. from cron) so rows never land in the default
+partition. Expired partitions are detached; with --archive-dir their rows are
+also written to a gzipped CSV and the table dropped, one transaction per partition.
+"""
+import argparse
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+PARENT = "stock_movements"
+DEFAULT_PARTITION = f"{PARENT}_default"
+PARTITION_NAME = re.compile(rf"^{PARENT}_y(\d{{4}})m(\d{{2}})$")
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year:04d}m{month.month:02d}"
+
+def create_partition_sql(month: date) -> str:
+    start = date(month.year, month.month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{add_months(start, 1).isoformat()}')"
+    )
+
+def list_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """Monthly partitions currently attached to the parent, oldest first."""
+    names = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT},
+    ).scalars()
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def ensure_partitions(conn: Connection, *, ahead: int, today: date) -> List[str]:
+    """Create any missing partitions from this month through ``ahead`` months out."""
+    existing = {name for name, _ in list_partitions(conn)}
+    this_month = today.replace(day=1)
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(this_month, offset)
+        if partition_name(month) not in existing:
+            conn.execute(text(create_partition_sql(month)))
+            created.append(partition_name(month))
+    return created
+
+def archive_partition(conn: Connection, name: str, archive_dir: str) -> str:
+    """Write a partition's rows to ``archive_dir``/<name>.csv.gz and return the path."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = path + ".partial"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        with gzip.open(partial, "wt", encoding="utf-8") as archive:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+    finally:
+        cursor.close()
+    os.replace(partial, path)
+    return path
+
+def expired_partitions(conn: Connection, *, retain_months: int, today: date) -> List[str]:
+    """Attached partitions whose whole month is older than ``retain_months``."""
+    cutoff = add_months(today.replace(day=1), -retain_months)
+    return [name for name, month in list_partitions(conn) if month < cutoff]
+
+def retire_partition(conn: Connection, name: str, archive_dir: Optional[str] = None) -> None:
+    """
+    Detach ``name`` from the parent; with ``archive_dir`` also archive its
+    rows and drop it. Run in its own transaction so a failed archive leaves
+    the partition attached.
+    """
+    conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    if archive_dir:
+        path = archive_partition(conn, name, archive_dir)
+        conn.execute(text(f"DROP TABLE {name}"))
+        logger.info("Archived %s to %s", name, path)
+    else:
+        logger.info("Detached %s", name)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ahead", type=int, default=3, help="months of partitions to create ahead")
+    parser.add_argument(
+        "--retain-months", type=int, default=None,
+        help="detach (or archive) partitions older than this many months",
+    )
+    parser.add_argument("--archive-dir", help="write expired partitions here as gzipped CSV, then drop them")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import engine
+
+    if engine.dialect.name != "postgresql":
+        parser.error("stock_movements is only partitioned on PostgreSQL")
+    today = datetime.utcnow().date()
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, ahead=args.ahead, today=today)
+        logger.info("Created partitions: %s", created or "none")
+    if args.retain_months is not None:
+        with engine.connect() as conn:
+            expired = expired_partitions(conn, retain_months=args.retain_months, today=today)
+        for name in expired:
+            with engine.begin() as conn:
+                retire_partition(conn, name, args.archive_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Connection pool configuration and instrumentation shared by both engines.
+"""
+import time
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import Gauge, Histogram
+
+# Engines registered for the pool gauges, by name
+ENGINES: Dict[str, Engine] = {}
+
+checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    labelnames=("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+class _TimedCheckout:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_wait.observe(time.perf_counter() - started, engine=self._engine_name)
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    _engine_name = "default"
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    _engine_name = "default"
+
+def engine_options(
+    url: str,
+    *,
+    name: str,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pool_recycle: int,
+    pool_pre_ping: bool,
+    pgbouncer: bool,
+    is_async: bool = False,
+) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_engine/create_async_engine.
+
+    ``pgbouncer`` makes the engine safe behind PgBouncer in transaction
+    pooling mode: asyncpg's server-side prepared statement caches are turned
+    off and statement names are made unique, since consecutive transactions
+    may land on different server connections. (psycopg2 never prepares
+    statements server-side, so it needs no changes.)
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (is_async or parsed.database in (None, "", ":memory:")):
+        # In-memory SQLite needs SQLAlchemy's single-connection pool, and aiosqlite
+        # connections must not be reused across event loops (NullPool)
+        return {}
+    base = InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool
+    options: Dict[str, Any] = {
+        "poolclass": type(base.__name__, (base,), {"_engine_name": name}),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+    }
+    if pgbouncer and parsed.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    return options
+
+def register_engine(name: str, engine: Any) -> None:
+    """Expose ``engine``'s pool (sync or async engine) through the gauges below."""
+    ENGINES[name] = getattr(engine, "sync_engine", engine)
+
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    status = {}
+    for name, engine in ENGINES.items():
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            status[name] = {"pool": type(pool).__name__}
+            continue
+        status[name] = {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "checkout_wait": checkout_wait.snapshot(engine=name),
+        }
+    return status
+
+def _gauge(field: str):
+    def read() -> Dict[tuple, float]:
+        return {
+            (name,): values[field]
+            for name, values in pool_status().items()
+            if field in values
+        }
+    return read
+
+Gauge("db_pool_size", "Configured pool size", _gauge("size"), labelnames=("engine",))
+Gauge("db_pool_checked_out", "Connections currently checked out", _gauge("checked_out"), labelnames=("engine",))
+Gauge("db_pool_overflow", "Overflow connections currently open", _gauge("overflow"), labelnames=("engine",))
@@ -0,0 +1,48 @@
+"""
+Recount the dashboard counters (and rebuild the low-stock set) from the
+source tables to correct drift.
+
+Run once (e.g. from cron):        python -m app.db.reconcile_counters
+Run every N seconds in a loop:    python -m app.db.reconcile_counters --loop
+"""
+import argparse
+import logging
+import time
+
+from app.core.config import settings
+from app.crud import crud_low_stock, crud_stats
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def reconcile_once() -> None:
+    db = SessionLocal()
+    try:
+        counts = crud_stats.reconcile(db)
+        logger.info("Reconciled stat counters: %s", counts)
+        changes = crud_low_stock.rebuild(db)
+        logger.info("Rebuilt low-stock set: %s", changes)
+    finally:
+        db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loop", action="store_true", help="keep running")
+    parser.add_argument(
+        "--interval", type=int, default=settings.STAT_RECONCILE_INTERVAL_SECONDS
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        try:
+            reconcile_once()
+        except Exception:
+            if not args.loop:
+                raise
+            logger.exception("Stat counter reconciliation failed")
+        if not args.loop:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Read-replica routing shared by both apps.
+
+A ReadRouter decides, per request, whether a read-only endpoint may use the
+replica. It may not when:
+
+- the replica failed its last health check, is not streaming WAL from
+  the primary, is more than ``max_lag`` seconds behind it, or has not been
+  checked yet;
+- the same caller (a user id) wrote through this process within the last
+  ``sticky_seconds``, so users normally read their own writes.
+
+Health is checked every ``check_interval`` seconds by a background thread,
+never on the request path. Stickiness is only best effort: it is kept per
+process, so with several workers a caller's next read may reach a worker
+that did not see the write. That read can be up to ``max_lag`` stale like
+any other.
+"""
+import logging
+import threading
+import time
+from typing import Hashable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.cache import TTLCache
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Seconds since the last replayed transaction, or 0 when the standby has
+# replayed everything it received (an idle primary sends nothing new). NULL
+# when its WAL receiver is not streaming: a standby cut off from the primary
+# has also replayed all it received, but can be arbitrarily far behind.
+# pg_stat_wal_receiver's status is only visible to superusers and members of
+# pg_read_all_stats, which the replica's user must therefore be.
+_PG_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+ROUTERS = {}
+
+reads_routed = Counter(
+    "db_reads_routed", "Read-only requests by the engine they were routed to", labelnames=("replica", "target")
+)
+
+def _lag_gauge():
+    return {(name,): -1.0 if router.lag is None else router.lag for name, router in list(ROUTERS.items())}
+
+Gauge("db_replica_lag_seconds", "Replica lag at the last check (-1 = unreachable or not streaming)", _lag_gauge, labelnames=("replica",))
+
+class ReadRouter:
+    def __init__(
+        self,
+        replica: Engine,
+        *,
+        name: str,
+        max_lag: float = 5.0,
+        check_interval: float = 5.0,
+        sticky_seconds: float = 10.0,
+    ):
+        self.replica = replica
+        self.name = name
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # Seconds behind the primary at the last check; None while unknown or unreachable
+        self.lag: Optional[float] = None
+        self._recent_writers = TTLCache(f"{name}_recent_writers", maxsize=100000, ttl=sticky_seconds)
+        ROUTERS[name] = self
+        threading.Thread(target=self._monitor, name=f"{name}-monitor", daemon=True).start()
+
+    def check(self) -> Optional[float]:
+        """Measure the replica's lag now; None if it cannot be reached or is not streaming."""
+        try:
+            with self.replica.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    lag = conn.execute(_PG_LAG).scalar()
+                else:
+                    lag = conn.execute(text("SELECT 0")).scalar()
+        except Exception:
+            if self.lag is not None:
+                logger.warning("Read replica %s is unreachable, reading from the primary", self.name, exc_info=True)
+            self.lag = None
+            return None
+        if lag is None:
+            if self.lag is not None:
+                logger.warning("Read replica %s is not streaming from the primary, reading from it", self.name)
+            self.lag = None
+            return None
+        self.lag = float(lag)
+        return self.lag
+
+    def _monitor(self) -> None:
+        while True:
+            self.check()
+            time.sleep(self.check_interval)
+
+    @property
+    def healthy(self) -> bool:
+        lag = self.lag
+        return lag is not None and lag <= self.max_lag
+
+    def mark_write(self, caller: Hashable) -> None:
+        """Send ``caller``'s reads to the primary for the next sticky_seconds."""
+        self._recent_writers.set(caller, True)
+
+    def use_replica(self, caller: Optional[Hashable]) -> bool:
+        replica = self.healthy and (caller is None or self._recent_writers.get(caller) is None)
+        reads_routed.inc(replica=self.name, target="replica" if replica else "primary")
+        return replica
@@ -1,13 +1,87 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.db.pool import engine_options, register_engine
+from app.db.replica import ReadRouter
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+def _pool_options(url: str, name: str, is_async: bool = False) -> dict:
+    return engine_options(
+        url,
+        name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pgbouncer=settings.DB_PGBOUNCER_TRANSACTION_MODE,
+        is_async=is_async,
+    )
+
+# Counter, low-stock and rollup writes are INSERT ... ON CONFLICT upserts (crud_stats._upsert)
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+_dialect = make_url(settings.SQLALCHEMY_DATABASE_URI).get_backend_name()
+if _dialect not in SUPPORTED_DIALECTS:
+    raise RuntimeError(f"SQLALCHEMY_DATABASE_URI uses {_dialect}; the API supports {' and '.join(SUPPORTED_DIALECTS)}")
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **_pool_options(settings.SQLALCHEMY_DATABASE_URI, "primary"))
+register_engine("primary", engine)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def get_async_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.USE_ASYNC_DB:
+    _async_url = settings.ASYNC_SQLALCHEMY_DATABASE_URI or get_async_url(settings.SQLALCHEMY_DATABASE_URI)
+    async_engine = create_async_engine(_async_url, **_pool_options(_async_url, "primary_async", is_async=True))
+    register_engine("primary_async", async_engine)
+    instrument_engine(async_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read replica; read_router decides per request whether it may be used
+read_engine = None
+ReadSessionLocal = None
+read_router = None
+if settings.SQLALCHEMY_READ_REPLICA_URI:
+    _read_url = settings.SQLALCHEMY_READ_REPLICA_URI
+    read_engine = create_engine(_read_url, **_pool_options(_read_url, "replica"))
+    register_engine("replica", read_engine)
+    instrument_engine(read_engine)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    read_router = ReadRouter(
+        read_engine,
+        name="replica",
+        max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+        sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    )
+
+async_read_engine = None
+AsyncReadSessionLocal = None
+if settings.USE_ASYNC_DB and settings.SQLALCHEMY_READ_REPLICA_URI:
+    _async_read_url = (
+        settings.ASYNC_SQLALCHEMY_READ_REPLICA_URI or get_async_url(settings.SQLALCHEMY_READ_REPLICA_URI)
+    )
+    async_read_engine = create_async_engine(
+        _async_read_url, **_pool_options(_async_read_url, "replica_async", is_async=True)
+    )
+    register_engine("replica_async", async_read_engine)
+    instrument_engine(async_read_engine)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -1,8 +1,18 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.api.v1.api import api_router
+from app.core.config import settings
+from app.core.idempotency import REPLAYED_HEADER
+from app.core.instrumentation import DB_QUERIES_HEADER, DB_TIME_HEADER, MetricsMiddleware, metrics_response
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import FastJSONResponse
 from app.routers import auth, warehouse, item, movement
 
-app = FastAPI()
+# Cache invalidation and the Idempotency-Key store, which also serves the
+# legacy item and movement routes, are configured by api_router from Settings
+
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -11,13 +21,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, DB_QUERIES_HEADER, DB_TIME_HEADER, REPLAYED_HEADER],
+)
+# Per-route latency and SQL statistics; X-DB-Queries/X-DB-Time with DB_DEBUG_HEADERS=true
+app.add_middleware(
+    MetricsMiddleware,
+    debug_headers=os.getenv("DB_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes"),
 )
 
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(warehouse.router, prefix="/warehouses", tags=["warehouses"])
 app.include_router(item.router, prefix="/items", tags=["items"])
 app.include_router(movement.router, prefix="/movements", tags=["movements"])
+# The /api/v1 application (app.api, app.crud, app.db.session) used by the frontend
+app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/")
 async def root():
     return {"message": "WMS API is running"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape target; values are per worker process
+    return metrics_response()
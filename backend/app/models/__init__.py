@@ -1,4 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
+"""
+Models of the legacy app (app.main routers, app.database). The /api/v1
+models are this package's submodules, on their own Base (app.models.base).
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
 
@@ -37,6 +41,11 @@ class Item(Base):
 
 class StockMovement(Base):
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        # Keyset pagination of movement history
+        Index("ix_stock_movements_timestamp_id", "timestamp", "id"),
+        Index("ix_stock_movements_item_id_timestamp_id", "item_id", "timestamp", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     item_id = Column(Integer, ForeignKey("items.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Text, LargeBinary, DateTime, Index
+from app.models.base import Base
+
+class IdempotencyKey(Base):
+    """
+    Responses stored per Idempotency-Key (see app.core.idempotency). A row
+    without a status_code is a request still in progress.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    # sha256 of the caller, method, path and client key
+    key = Column(String(64), primary_key=True)
+    fingerprint = Column(String(64))
+    status_code = Column(Integer)
+    headers = Column(Text)
+    body = Column(LargeBinary)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Enum
+from datetime import datetime
+from sqlalchemy import Column, DateTime, String, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
-from app.models.base import BaseModel
+from app.models.base import Base, BaseModel
 
 class MovementType(enum.Enum):
     INBOUND = "inbound"
@@ -10,6 +11,11 @@ class MovementType(enum.Enum):
 
 class InventoryItem(BaseModel):
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        Index("ix_inventory_items_created_at_id", "created_at", "id"),
+        Index("ix_inventory_items_location_created_at_id", "storage_location_id", "created_at", "id"),
+        Index("ix_inventory_items_updated_at", "updated_at"),
+    )
 
     name = Column(String, nullable=False)
     barcode = Column(String, unique=True, nullable=False)
@@ -24,7 +30,15 @@ class InventoryItem(BaseModel):
 
 class StockMovement(BaseModel):
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        # Keyset pagination of movement history
+        Index("ix_stock_movements_created_at_id", "created_at", "id"),
+        Index("ix_stock_movements_item_id_created_at_id", "item_id", "created_at", "id"),
+    )
 
+    # On PostgreSQL the table is range-partitioned by month on created_at (see
+    # alembic 0004 and app.db.partitions), so the partition key can't be NULL
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     movement_type = Column(Enum(MovementType), nullable=False)
@@ -37,4 +51,15 @@ class StockMovement(BaseModel):
     item = relationship("InventoryItem", back_populates="movements")
     from_location = relationship("StorageLocation", foreign_keys=[from_location_id])
     to_location = relationship("StorageLocation", foreign_keys=[to_location_id])
-    user = relationship("User") 
\ No newline at end of file
+    user = relationship("User")
+
+class LowStockItem(Base):
+    """
+    The items whose quantity is below their min_quantity, maintained by the
+    write path (see app.crud.crud_low_stock) so low-stock reports never scan
+    the catalog.
+    """
+    __tablename__ = "low_stock_items"
+
+    item_id = Column(Integer, ForeignKey("inventory_items.id", ondelete="CASCADE"), primary_key=True)
+    below_since = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, Enum, Index
+from app.models.base import Base
+from app.models.inventory import MovementType
+
+class StatCounter(Base):
+    """
+    Incrementally maintained row counts behind the dashboard.
+
+    Hot counters are spread over several shards so concurrent writers don't
+    queue on one row; a counter's value is the sum of its shards.
+    """
+    __tablename__ = "stat_counters"
+
+    name = Column(String, primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class MovementRollup(Base):
+    """
+    Units moved and movement counts per day, item, location and movement type,
+    maintained in the same transaction as the movements themselves.
+
+    ``location_id`` is the location whose stock the movement changed: the
+    source of an outbound movement, the destination of an inbound one or a
+    transfer, and 0 when the movement names no location.
+    """
+    __tablename__ = "movement_daily_rollups"
+    __table_args__ = (
+        Index("ix_movement_daily_rollups_item_id_day", "item_id", "day"),
+        Index("ix_movement_daily_rollups_location_id_day", "location_id", "day"),
+    )
+
+    day = Column(Date, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    location_id = Column(Integer, primary_key=True, default=0)
+    movement_type = Column(Enum(MovementType), primary_key=True)
+    quantity = Column(BigInteger, nullable=False, default=0)
+    movements = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
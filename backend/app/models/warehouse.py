@@ -1,9 +1,14 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 
 class Warehouse(BaseModel):
     __tablename__ = "warehouses"
+    __table_args__ = (
+        Index("ix_warehouses_created_at_id", "created_at", "id"),
+        # max(updated_at) for listing ETags
+        Index("ix_warehouses_updated_at", "updated_at"),
+    )
 
     name = Column(String, nullable=False)
     code = Column(String, unique=True, nullable=False)
@@ -15,6 +20,10 @@ class Warehouse(BaseModel):
 
 class StorageLocation(BaseModel):
     __tablename__ = "storage_locations"
+    __table_args__ = (
+        Index("ix_storage_locations_warehouse_created_at_id", "warehouse_id", "created_at", "id"),
+        Index("ix_storage_locations_warehouse_updated_at", "warehouse_id", "updated_at"),
+    )
 
     name = Column(String, nullable=False)
     code = Column(String, nullable=False)
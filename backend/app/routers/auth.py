@@ -2,8 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
+import os
+from app.core.hashing import PasswordHasher, PasswordHasherBusy
 from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserLogin, Token
@@ -12,7 +13,19 @@ SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs on a small process pool so login bursts can't starve request threads
+password_hasher = PasswordHasher(
+    workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "2")),
+    queue_limit=int(os.environ.get("PASSWORD_HASH_QUEUE_LIMIT", "16")),
+    rounds=int(os.environ.get("BCRYPT_ROUNDS", "12")),
+)
+
+def _busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password operations, please retry",
+        headers={"Retry-After": "1"},
+    )
 
 router = APIRouter()
 
@@ -21,7 +34,10 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.email == user.email).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = pwd_context.hash(user.password)
+    try:
+        hashed_password = password_hasher.hash(user.password)
+    except PasswordHasherBusy:
+        raise _busy()
     new_user = User(email=user.email, hashed_password=hashed_password)
     db.add(new_user)
     db.commit()
@@ -32,8 +48,18 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 def login(user: UserLogin, db: Session = Depends(get_db)):
     db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not pwd_context.verify(user.password, db_user.hashed_password):
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    try:
+        verified, new_hash = password_hasher.verify_and_update(user.password, db_user.hashed_password)
+    except PasswordHasherBusy:
+        raise _busy()
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made; upgrade it transparently
+        db_user.hashed_password = new_hash
+        db.commit()
     access_token = create_access_token(data={"sub": db_user.email})
     return {"access_token": access_token, "token_type": "bearer"}
 
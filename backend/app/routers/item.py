@@ -1,11 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+import os
+from app.auth import IdempotentRoute
+from app.core.cache import TTLCache, invalidate_on_commit
+from app.core.search import ranked_search
 from app.database import get_db
 from app.models import Item
 from app.schemas import ItemCreate, ItemOut, ItemUpdate
 from typing import List
 
-router = APIRouter()
+# Barcode -> [ItemOut] for scan lookups (search?barcode=...); item and movement
+# writes invalidate the barcode after commit
+barcode_cache = TTLCache(
+    "legacy_barcodes",
+    maxsize=int(os.environ.get("BARCODE_CACHE_MAX_SIZE", "50000")),
+    ttl=float(os.environ.get("BARCODE_CACHE_TTL_SECONDS", "30")),
+)
+
+router = APIRouter(route_class=IdempotentRoute)
 
 @router.post("/", response_model=ItemOut)
 def add_item(item: ItemCreate, db: Session = Depends(get_db)):
@@ -20,6 +32,7 @@ def edit_item(item_id: int, item: ItemUpdate, db: Session = Depends(get_db)):
     db_item = db.query(Item).filter(Item.id == item_id).first()
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_on_commit(db, barcode_cache, db_item.barcode)
     for key, value in item.dict(exclude_unset=True).items():
         setattr(db_item, key, value)
     db.commit()
@@ -31,15 +44,37 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
     db_item = db.query(Item).filter(Item.id == item_id).first()
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_on_commit(db, barcode_cache, db_item.barcode)
     db.delete(db_item)
     db.commit()
     return {"detail": "Item deleted"}
 
 @router.get("/search", response_model=List[ItemOut])
-def search_items(name: str = None, barcode: str = None, db: Session = Depends(get_db)):
+def search_items(
+    name: str = None,
+    barcode: str = None,
+    q: str = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    # `q` (or the older `name`) matches both name and barcode, best first
+    term = q or name
+    scan = barcode and not term and skip == 0 and limit > 0
+    if scan:
+        cached = barcode_cache.get(barcode)
+        if cached is not None:
+            return cached
     query = db.query(Item)
-    if name:
-        query = query.filter(Item.name.ilike(f"%{name}%"))
     if barcode:
         query = query.filter(Item.barcode == barcode)
-    return query.all()
+    if term:
+        query = ranked_search(
+            query, term, name_col=Item.name, barcode_col=Item.barcode, id_col=Item.id
+        )
+    else:
+        query = query.order_by(Item.id)
+    items = query.offset(skip).limit(limit).all()
+    if scan and items:
+        barcode_cache.set(barcode, [ItemOut.model_validate(item, from_attributes=True) for item in items])
+    return items
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from app.schemas import StockMovementCreate, StockMovementOut
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from typing import List, Literal, Optional
+from app.core.cache import invalidate_on_commit
+from app.core.export import export_response
+from app.core.pagination import Cursor, cursor_param, paginate, set_next_cursor
+from app.core.responses import trusted_json_response
+from app.database import get_db, get_read_db, get_read_sessionmaker
+from app.schemas import (
+    StockMovementCreate,
+    StockMovementOut,
+    StockMovementBatchCreate,
+    StockMovementBatchOut,
+)
 from app.models import StockMovement, Item, StorageLocation, User
-from app.auth import get_current_user
+from app.auth import IdempotentRoute, get_current_user
+from app.routers.item import barcode_cache
 
 router = APIRouter(
     prefix="/movements",
+    route_class=IdempotentRoute,
     tags=["movements"]
 )
 
@@ -17,11 +30,6 @@ def create_movement(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Verify item exists
-    item = db.query(Item).filter(Item.id == movement.item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
     # Verify locations exist if provided
     if movement.from_location_id:
         from_location = db.query(StorageLocation).filter(StorageLocation.id == movement.from_location_id).first()
@@ -33,6 +41,14 @@ def create_movement(
         if not to_location:
             raise HTTPException(status_code=404, detail="To location not found")
     
+    # Update item quantity in the database so concurrent movements can't lose updates
+    if not _apply_quantity_change(db, movement):
+        # End the transaction now rather than when the session is closed after the response
+        db.rollback()
+        if not db.query(Item.id).filter(Item.id == movement.item_id).first():
+            raise HTTPException(status_code=404, detail="Item not found")
+        raise HTTPException(status_code=400, detail="Insufficient stock")
+    
     # Create movement
     db_movement = StockMovement(
         item_id=movement.item_id,
@@ -43,37 +59,167 @@ def create_movement(
         movement_type=movement.movement_type
     )
     
-    # Update item quantity based on movement type
-    if movement.movement_type == "inbound":
-        item.quantity += movement.quantity
-    elif movement.movement_type == "outbound":
-        if item.quantity < movement.quantity:
-            raise HTTPException(status_code=400, detail="Insufficient stock")
-        item.quantity -= movement.quantity
-    elif movement.movement_type == "move":
-        if item.quantity < movement.quantity:
-            raise HTTPException(status_code=400, detail="Insufficient stock")
-        item.location_id = movement.to_location_id
-    
     db.add(db_movement)
     db.commit()
     db.refresh(db_movement)
     return db_movement
 
+def _apply_quantity_change(db: Session, movement: StockMovementCreate) -> bool:
+    """
+    Apply a movement to its item with one conditional UPDATE.
+
+    Outbound and move rows only match while the item still holds enough
+    stock, so the check and the write happen atomically in the database.
+    Returns False when no row was updated (missing item or insufficient stock).
+    """
+    stmt = update(Item).where(Item.id == movement.item_id)
+    if movement.movement_type == "inbound":
+        stmt = stmt.values(quantity=Item.quantity + movement.quantity)
+    elif movement.movement_type == "outbound":
+        stmt = stmt.where(Item.quantity >= movement.quantity)\
+            .values(quantity=Item.quantity - movement.quantity)
+    elif movement.movement_type == "move":
+        stmt = stmt.where(Item.quantity >= movement.quantity)\
+            .values(location_id=movement.to_location_id)
+    else:
+        return db.query(Item.id).filter(Item.id == movement.item_id).first() is not None
+    row = db.execute(stmt.returning(Item.barcode), execution_options={"synchronize_session": False}).first()
+    if row is None:
+        return False
+    invalidate_on_commit(db, barcode_cache, row.barcode)
+    return True
+
+@router.post("/batch", response_model=StockMovementBatchOut)
+def create_movements_batch(
+    batch: StockMovementBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Validate all items and locations with one query each
+    item_ids = {m.item_id for m in batch.movements}
+    location_ids = {
+        location_id
+        for m in batch.movements
+        for location_id in (m.from_location_id, m.to_location_id)
+        if location_id
+    }
+    # Lock the items (in id order, to avoid deadlocks) for the whole batch
+    items = {
+        item.id: item
+        for item in db.query(Item).filter(Item.id.in_(item_ids)).order_by(Item.id).with_for_update()
+    }
+    known_locations = set()
+    if location_ids:
+        known_locations = {
+            location_id
+            for (location_id,) in db.query(StorageLocation.id).filter(StorageLocation.id.in_(location_ids))
+        }
+
+    # Apply quantity changes in order so later rows see earlier ones
+    results = []
+    for index, movement in enumerate(batch.movements):
+        item = items.get(movement.item_id)
+        if not item:
+            results.append({"index": index, "success": False, "error": "Item not found"})
+            continue
+        if movement.from_location_id and movement.from_location_id not in known_locations:
+            results.append({"index": index, "success": False, "error": "From location not found"})
+            continue
+        if movement.to_location_id and movement.to_location_id not in known_locations:
+            results.append({"index": index, "success": False, "error": "To location not found"})
+            continue
+        if movement.movement_type in ("outbound", "move") and item.quantity < movement.quantity:
+            results.append({"index": index, "success": False, "error": "Insufficient stock"})
+            continue
+        if movement.movement_type == "inbound":
+            item.quantity += movement.quantity
+        elif movement.movement_type == "outbound":
+            item.quantity -= movement.quantity
+        elif movement.movement_type == "move":
+            item.location_id = movement.to_location_id
+        results.append({
+            "index": index,
+            "success": True,
+            "movement": StockMovement(
+                item_id=movement.item_id,
+                user_id=current_user.id,
+                from_location_id=movement.from_location_id,
+                to_location_id=movement.to_location_id,
+                quantity=movement.quantity,
+                movement_type=movement.movement_type
+            ),
+        })
+
+    # Insert every accepted movement in the same transaction
+    db_movements = [result["movement"] for result in results if result["success"]]
+    invalidate_on_commit(db, barcode_cache, *{items[m.item_id].barcode for m in db_movements})
+    db.add_all(db_movements)
+    db.flush()
+    movement_ids = [db_movement.id for db_movement in db_movements]
+    db.commit()
+    if movement_ids:
+        db.query(StockMovement).filter(StockMovement.id.in_(movement_ids)).all()
+
+    return {
+        "created": len(db_movements),
+        "failed": len(results) - len(db_movements),
+        "results": results,
+    }
+
 @router.get("/", response_model=List[StockMovementOut])
 def get_movements(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    after: Optional[Cursor] = Depends(cursor_param),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    movements = db.query(StockMovement).offset(skip).limit(limit).all()
-    return movements
+    movements = _paginate(db.query(StockMovement), skip, limit, after).all()
+    set_next_cursor(response, movements, limit, created_attr="timestamp")
+    return trusted_json_response(response, StockMovementOut, movements)
+
+@router.get("/export")
+def export_movements(
+    format: Literal["csv", "ndjson"] = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    item_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    movement_type: Optional[str] = None,
+    read_sessions: sessionmaker = Depends(get_read_sessionmaker),
+    current_user: User = Depends(get_current_user)
+):
+    # Full history, oldest first, streamed from a server-side cursor; `end` is exclusive
+    stmt = select(
+        StockMovement.id,
+        StockMovement.timestamp,
+        StockMovement.item_id,
+        StockMovement.movement_type,
+        StockMovement.quantity,
+        StockMovement.from_location_id,
+        StockMovement.to_location_id,
+        StockMovement.user_id,
+    ).order_by(StockMovement.timestamp, StockMovement.id)
+    if start:
+        stmt = stmt.where(StockMovement.timestamp >= start)
+    if end:
+        stmt = stmt.where(StockMovement.timestamp < end)
+    if item_id:
+        stmt = stmt.where(StockMovement.item_id == item_id)
+    if location_id:
+        stmt = stmt.where(or_(
+            StockMovement.from_location_id == location_id,
+            StockMovement.to_location_id == location_id,
+        ))
+    if movement_type:
+        stmt = stmt.where(StockMovement.movement_type == movement_type)
+    return export_response(read_sessions, stmt, format, f"movements-{date.today():%Y%m%d}")
 
 @router.get("/{movement_id}", response_model=StockMovementOut)
 def get_movement(
     movement_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     movement = db.query(StockMovement).filter(StockMovement.id == movement_id).first()
@@ -84,14 +230,21 @@ def get_movement(
 @router.get("/item/{item_id}", response_model=List[StockMovementOut])
 def get_item_movements(
     item_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    after: Optional[Cursor] = Depends(cursor_param),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    movements = db.query(StockMovement)\
-        .filter(StockMovement.item_id == item_id)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
-    return movements 
\ No newline at end of file
+    query = db.query(StockMovement).filter(StockMovement.item_id == item_id)
+    movements = _paginate(query, skip, limit, after).all()
+    set_next_cursor(response, movements, limit, created_attr="timestamp")
+    return trusted_json_response(response, StockMovementOut, movements)
+
+def _paginate(query, skip: int, limit: int, after: Optional[Cursor]):
+    # Newest first on (timestamp, id); a cursor switches from offset to keyset paging
+    return paginate(
+        query, StockMovement.timestamp, StockMovement.id,
+        after=after, skip=skip, limit=limit, descending=True,
+    ) 
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import Warehouse
 from app.schemas import WarehouseCreate, WarehouseOut
 from typing import List
@@ -16,5 +16,5 @@ def create_warehouse(warehouse: WarehouseCreate, db: Session = Depends(get_db)):
     return db_warehouse
 
 @router.get("/", response_model=List[WarehouseOut])
-def list_warehouses(db: Session = Depends(get_db)):
+def list_warehouses(db: Session = Depends(get_read_db)):
     return db.query(Warehouse).all()
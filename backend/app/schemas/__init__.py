@@ -1,4 +1,7 @@
-from pydantic import BaseModel, EmailStr
+"""
+Schemas of the legacy app. The /api/v1 schemas are this package's submodules.
+"""
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -24,7 +27,7 @@ class WarehouseCreate(WarehouseBase):
 class WarehouseOut(WarehouseBase):
     id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class StorageLocationBase(BaseModel):
     name: str
@@ -36,7 +39,7 @@ class StorageLocationCreate(StorageLocationBase):
 class StorageLocationOut(StorageLocationBase):
     id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class ItemBase(BaseModel):
     name: str
@@ -56,7 +59,7 @@ class ItemUpdate(BaseModel):
 class ItemOut(ItemBase):
     id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class StockMovementBase(BaseModel):
     item_id: int
@@ -73,4 +76,18 @@ class StockMovementCreate(StockMovementBase):
 class StockMovementOut(StockMovementBase):
     id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+class StockMovementBatchCreate(BaseModel):
+    movements: List[StockMovementCreate] = Field(..., min_length=1, max_length=1000)
+
+class StockMovementBatchResult(BaseModel):
+    index: int
+    success: bool
+    movement: Optional[StockMovementOut] = None
+    error: Optional[str] = None
+
+class StockMovementBatchOut(BaseModel):
+    created: int
+    failed: int
+    results: List[StockMovementBatchResult]
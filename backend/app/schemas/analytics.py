@@ -0,0 +1,17 @@
+from datetime import date
+from typing import Optional
+from pydantic import BaseModel
+
+from app.models.inventory import MovementType
+
+class DailyThroughput(BaseModel):
+    day: date
+    movement_type: MovementType
+    warehouse_id: Optional[int] = None
+    quantity: int
+    movements: int
+
+class ItemThroughput(BaseModel):
+    item_id: int
+    quantity: int
+    movements: int
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class DashboardStats(BaseModel):
+    totalWarehouses: int
+    totalItems: int
+    totalLocations: int
+    recentMovements: int
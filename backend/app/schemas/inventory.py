@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from app.models.inventory import MovementType
+from app.schemas.user import User
+from app.schemas.warehouse import StorageLocation
 
 class InventoryItemBase(BaseModel):
     name: str
@@ -27,6 +29,23 @@ class InventoryItem(InventoryItemBase):
     class Config:
         from_attributes = True
 
+class LowStockItem(InventoryItem):
+    """An item below its min_quantity, with where it is and since when."""
+    warehouse_id: int
+    below_since: datetime
+
+class InventoryImportError(BaseModel):
+    row: int
+    barcode: Optional[str] = None
+    error: str
+
+class InventoryImportResult(BaseModel):
+    total: int
+    created: int
+    failed: int
+    dry_run: bool
+    errors: List[InventoryImportError]
+
 class StockMovementBase(BaseModel):
     item_id: int
     quantity: int
@@ -44,4 +63,25 @@ class StockMovement(StockMovementBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class StockMovementExpanded(StockMovement):
+    """A movement with the relationships named in ``?expand=`` nested (others are null)."""
+    item: Optional[InventoryItem] = None
+    from_location: Optional[StorageLocation] = None
+    to_location: Optional[StorageLocation] = None
+    user: Optional[User] = None
+
+class StockMovementBatchCreate(BaseModel):
+    movements: List[StockMovementCreate] = Field(..., min_length=1, max_length=1000)
+
+class StockMovementBatchResult(BaseModel):
+    index: int
+    success: bool
+    movement: Optional[StockMovement] = None
+    error: Optional[str] = None
+
+class StockMovementBatchResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[StockMovementBatchResult]
\ No newline at end of file
@@ -30,4 +30,16 @@ class Token(BaseModel):
     token_type: str
 
 class TokenPayload(BaseModel):
-    sub: Optional[int] = None 
\ No newline at end of file
+    sub: Optional[int] = None
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+
+class CurrentUser(BaseModel):
+    """The authenticated user as seen by the auth dependencies (cacheable)."""
+    id: int
+    email: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+
+    class Config:
+        from_attributes = True 
\ No newline at end of file
@@ -0,0 +1 @@
+# Benchmarks for the WMS backend hot paths
@@ -0,0 +1,99 @@
+"""
+Microbenchmark of list response serialization, in milliseconds per 1,000 rows.
+
+For the item, warehouse and movement listings it times three ways of turning
+a page of ORM objects into a response body:
+
+    stdlib     what FastAPI does for response_model=List[...]: validate every
+               row through pydantic, then encode with json.dumps (JSONResponse)
+    orjson     the same validation, encoded by FastJSONResponse
+    trusted    trusted_json_response: attributes read straight off the rows
+               and encoded with one orjson call
+
+No database is involved; the rows are transient ORM instances.
+
+    python -m benchmarks.serialization --rows 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, List
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import FastJSONResponse, trusted_json_response
+from app.models import Item, StockMovement, StorageLocation, Warehouse
+from app.schemas import ItemOut, StockMovementOut, StorageLocationOut, WarehouseOut
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--rows", type=int, default=1000, help="rows per response")
+parser.add_argument("--repeat", type=int, default=50, help="responses timed per method")
+
+
+def make_rows(n: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "items": (ItemOut, [
+            Item(id=i, name=f"steel bolt {i}", barcode=f"BC{i:010d}", quantity=float(i % 500), location_id=i % 50 + 1)
+            for i in range(1, n + 1)
+        ]),
+        "movements": (StockMovementOut, [
+            StockMovement(
+                id=i, item_id=i % 2000 + 1, user_id=i % 20 + 1, from_location_id=None,
+                to_location_id=i % 50 + 1, quantity=float(i % 50 + 1), movement_type="inbound",
+                timestamp=now - timedelta(seconds=i),
+            )
+            for i in range(1, n + 1)
+        ]),
+        "warehouses": (WarehouseOut, [Warehouse(id=i, name=f"Warehouse {i}") for i in range(1, n + 1)]),
+        "locations": (StorageLocationOut, [
+            StorageLocation(id=i, name=f"Location {i}", warehouse_id=i % 5 + 1) for i in range(1, n + 1)
+        ]),
+    }
+
+
+async def validated_body(response_class, field, rows: List[Any]) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return response_class(content).body
+
+
+def time_per_response(render: Callable[[], bytes], repeat: int) -> float:
+    render()  # warm caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> int:
+    args = parser.parse_args()
+    loop = asyncio.new_event_loop()
+    report = {"rows": args.rows, "repeat": args.repeat, "ms_per_1k_rows": {}}
+    scale = 1000 / args.rows * 1000
+    for name, (schema, rows) in make_rows(args.rows).items():
+        field = create_response_field(name=f"response_{name}", type_=List[schema])
+        methods = {
+            "stdlib": lambda: loop.run_until_complete(validated_body(JSONResponse, field, rows)),
+            "orjson": lambda: loop.run_until_complete(validated_body(FastJSONResponse, field, rows)),
+            "trusted": lambda: trusted_json_response(Response(), schema, rows).body,
+        }
+        bodies = {method: json.loads(render()) for method, render in methods.items()}
+        assert bodies["stdlib"] == bodies["orjson"] == bodies["trusted"], f"{name}: outputs differ"
+        timings = {method: time_per_response(render, args.repeat) * scale for method, render in methods.items()}
+        report["ms_per_1k_rows"][name] = {
+            **{method: round(ms, 3) for method, ms in timings.items()},
+            "speedup": round(timings["stdlib"] / timings["trusted"], 1),
+        }
+    loop.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())